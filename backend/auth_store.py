@@ -0,0 +1,184 @@
+"""User credentials and password reset codes.
+
+``MongoAuthStore`` keeps users in ``users`` (unique indexes on username and
+email) and reset codes in ``password_reset_codes`` (``_id`` = code, TTL
+index on ``expires_at`` so MongoDB evicts expired codes on its own).
+``MemoryAuthStore`` implements the same interface for tests and benchmarks.
+
+Password hashing is CPU bound, so ``PasswordHasher`` runs bcrypt in a small
+dedicated thread pool instead of on the event loop.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from passlib.context import CryptContext
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+PUBLIC_USER_FIELDS = ("id", "username", "email", "firstName", "lastName", "role")
+
+DEFAULT_USERS = [
+    {"id": "1", "username": "admin", "email": "admin@dounie-cuisine.ca",
+     "firstName": "Admin", "lastName": "Dounie", "role": "admin", "password": "Admin123!"},
+    {"id": "2", "username": "staff", "email": "staff@dounie-cuisine.ca",
+     "firstName": "Staff", "lastName": "Member", "role": "staff", "password": "Staff123!"},
+]
+
+
+def public_user(user: dict) -> dict:
+    return {field: user[field] for field in PUBLIC_USER_FIELDS}
+
+
+class PasswordHasher:
+    """bcrypt hashing off the event loop, bounded by a thread pool"""
+
+    def __init__(self, max_workers: int = 4):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        # Verified against when the username is unknown, so that both paths cost the same
+        self._dummy_hash: Optional[str] = None
+
+    async def warm_up(self):
+        """Load the bcrypt backend and the dummy hash before the first login"""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash("dounie-cuisine-dummy-password")
+
+    async def hash(self, password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: Optional[str]) -> bool:
+        loop = asyncio.get_running_loop()
+        if password_hash is None:
+            await self.warm_up()
+            await loop.run_in_executor(self.executor, self.context.verify, password, self._dummy_hash)
+            return False
+        return await loop.run_in_executor(self.executor, self.context.verify, password, password_hash)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+class MongoAuthStore:
+    """Users and reset codes stored in MongoDB"""
+
+    def __init__(self, db):
+        self.users = db["users"]
+        self.reset_codes = db["password_reset_codes"]
+
+    async def ensure_indexes(self):
+        await self.users.create_index("username", unique=True)
+        await self.users.create_index("email", unique=True)
+        await self.reset_codes.create_index("expires_at", expireAfterSeconds=0)
+        await self.reset_codes.create_index([("email", ASCENDING), ("expires_at", ASCENDING)])
+
+    async def count_users(self) -> int:
+        return await self.users.count_documents({})
+
+    async def add_user(self, user: dict, password_hash: str):
+        await self.users.insert_one({"_id": user["id"], **user, "passwordHash": password_hash})
+
+    async def get_user(self, username: str) -> Optional[dict]:
+        return await self.users.find_one({"username": username})
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return await self.users.find_one({"email": email})
+
+    async def set_password_hash(self, username: str, password_hash: str):
+        await self.users.update_one(
+            {"username": username},
+            {"$set": {"passwordHash": password_hash, "updatedAt": datetime.utcnow()}},
+        )
+
+    async def add_reset_code(self, code: str, email: str, expires_at: datetime):
+        await self.reset_codes.insert_one(
+            {"_id": code, "email": email, "expires_at": expires_at, "used": False}
+        )
+
+    async def get_reset_code(self, code: str) -> Optional[dict]:
+        """Return the code if it is unused and not expired"""
+        return await self.reset_codes.find_one(
+            {"_id": code, "used": False, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+
+    async def consume_reset_code(self, code: str) -> Optional[dict]:
+        """Atomically mark a valid code as used; None if it was not valid"""
+        return await self.reset_codes.find_one_and_update(
+            {"_id": code, "used": False, "expires_at": {"$gt": datetime.utcnow()}},
+            {"$set": {"used": True}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def list_active_codes(self) -> List[dict]:
+        cursor = self.reset_codes.find(
+            {"expires_at": {"$gt": datetime.utcnow()}, "used": False}
+        ).sort("expires_at", ASCENDING)
+        return await cursor.to_list(length=None)
+
+
+class MemoryAuthStore:
+    """In-process store with the same interface, for tests"""
+
+    def __init__(self):
+        self.users: Dict[str, dict] = {}
+        self.emails: Dict[str, str] = {}
+        self.reset_codes: Dict[str, dict] = {}
+
+    async def ensure_indexes(self):
+        pass
+
+    async def count_users(self) -> int:
+        return len(self.users)
+
+    async def add_user(self, user: dict, password_hash: str):
+        self.users[user["username"]] = {"_id": user["id"], **user, "passwordHash": password_hash}
+        self.emails[user["email"]] = user["username"]
+
+    async def get_user(self, username: str) -> Optional[dict]:
+        return self.users.get(username)
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        username = self.emails.get(email)
+        return self.users.get(username) if username else None
+
+    async def set_password_hash(self, username: str, password_hash: str):
+        if username in self.users:
+            self.users[username]["passwordHash"] = password_hash
+
+    async def add_reset_code(self, code: str, email: str, expires_at: datetime):
+        self.reset_codes[code] = {"_id": code, "email": email, "expires_at": expires_at, "used": False}
+
+    async def get_reset_code(self, code: str) -> Optional[dict]:
+        data = self.reset_codes.get(code)
+        if data is None or data["expires_at"] <= datetime.utcnow():
+            self.reset_codes.pop(code, None)
+            return None
+        return None if data["used"] else data
+
+    async def consume_reset_code(self, code: str) -> Optional[dict]:
+        data = await self.get_reset_code(code)
+        if data is not None:
+            data["used"] = True
+        return data
+
+    async def list_active_codes(self) -> List[dict]:
+        now = datetime.utcnow()
+        for code in [c for c, d in self.reset_codes.items() if d["expires_at"] <= now]:
+            del self.reset_codes[code]
+        active = [d for d in self.reset_codes.values() if not d["used"]]
+        return sorted(active, key=lambda d: d["expires_at"])
+
+
+async def seed_default_users(store, hasher: PasswordHasher):
+    """Create the built-in admin and staff accounts on an empty store"""
+    if await store.count_users():
+        return
+    for user in DEFAULT_USERS:
+        profile = {key: value for key, value in user.items() if key != "password"}
+        try:
+            await store.add_user(profile, await hasher.hash(user["password"]))
+        except DuplicateKeyError:
+            # Another worker seeded the same account first
+            pass
@@ -0,0 +1,135 @@
+"""Signed JWT access/refresh tokens and logout revocation.
+
+Verification never touches the database: the HMAC key is constructed once,
+the user's profile and role travel inside the token, and revoked token IDs
+sit in an in-process ``TokenDenylist``. Revocations are also written to
+``revoked_tokens`` (TTL index on ``expires_at``) and each worker pulls new
+entries from there every few seconds, so a logout on one worker reaches the
+others without any per-request round trip.
+"""
+import heapq
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwk, jwt
+from pymongo import ASCENDING
+
+ACCESS = "access"
+REFRESH = "refresh"
+PROFILE_CLAIMS = ("username", "email", "firstName", "lastName", "role")
+VERIFIED_CACHE_SIZE = 10000
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is malformed, expired, revoked or of the wrong type"""
+
+
+class TokenDenylist:
+    """Revoked token IDs, forgotten as soon as the token would have expired anyway"""
+
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        self._expiry: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, jti: str) -> bool:
+        expires = self._entries.get(jti)
+        return expires is not None and expires > time.time()
+
+    def add(self, jti: str, expires: float):
+        now = time.time()
+        self._prune(now)
+        if expires <= now or jti in self._entries:
+            return
+        self._entries[jti] = expires
+        heapq.heappush(self._expiry, (expires, jti))
+
+    def _prune(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry)
+            self._entries.pop(jti, None)
+
+
+class TokenService:
+    """Issues and verifies HS256 tokens with a cached key"""
+
+    def __init__(self, secret: str, access_minutes: int = 30, refresh_days: int = 7,
+                 algorithm: str = "HS256"):
+        self.algorithm = algorithm
+        self.key = jwk.construct(secret, algorithm)
+        self.access_ttl = timedelta(minutes=access_minutes)
+        self.refresh_ttl = timedelta(days=refresh_days)
+        self.denylist = TokenDenylist()
+        # Signature checks already done, keyed by the raw token string
+        self._verified: Dict[str, dict] = {}
+        self._synced_at: Optional[datetime] = None
+
+    def _issue(self, claims: dict, token_type: str, ttl: timedelta) -> str:
+        now = datetime.utcnow()
+        payload = {
+            **claims,
+            "type": token_type,
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+            "exp": now + ttl,
+        }
+        return jwt.encode(payload, self.key, algorithm=self.algorithm)
+
+    def issue_pair(self, user: dict) -> Dict[str, str]:
+        claims = {"sub": user["id"], **{claim: user[claim] for claim in PROFILE_CLAIMS}}
+        return {
+            "accessToken": self._issue(claims, ACCESS, self.access_ttl),
+            "refreshToken": self._issue(claims, REFRESH, self.refresh_ttl),
+        }
+
+    def verify(self, token: str, token_type: str = ACCESS) -> dict:
+        claims = self._verified.get(token)
+        if claims is None or claims["exp"] <= time.time():
+            try:
+                claims = jwt.decode(token, self.key, algorithms=[self.algorithm])
+            except JWTError as e:
+                self._verified.pop(token, None)
+                raise InvalidTokenError(str(e))
+            if len(self._verified) >= VERIFIED_CACHE_SIZE:
+                self._verified.clear()
+            self._verified[token] = claims
+        if claims.get("type") != token_type:
+            raise InvalidTokenError("wrong token type")
+        if claims.get("jti") in self.denylist:
+            raise InvalidTokenError("token revoked")
+        return claims
+
+    async def ensure_indexes(self, collection):
+        await collection.create_index("expires_at", expireAfterSeconds=0)
+        await collection.create_index([("revoked_at", ASCENDING)])
+
+    async def revoke(self, claims: dict, collection=None):
+        self.denylist.add(claims["jti"], claims["exp"])
+        if collection is not None:
+            await collection.update_one(
+                {"_id": claims["jti"]},
+                {"$setOnInsert": {
+                    "expires_at": datetime.utcfromtimestamp(claims["exp"]),
+                    "revoked_at": datetime.utcnow(),
+                }},
+                upsert=True,
+            )
+
+    async def pull_revocations(self, collection):
+        """Copy revocations made by other workers into the local denylist"""
+        query = {}
+        if self._synced_at is not None:
+            # Overlap a little to tolerate clock skew between workers
+            query["revoked_at"] = {"$gte": self._synced_at - timedelta(seconds=5)}
+        self._synced_at = datetime.utcnow()
+        cursor = collection.find(query, {"expires_at": 1})
+        async for doc in cursor:
+            self.denylist.add(doc["_id"], (doc["expires_at"] - datetime(1970, 1, 1)).total_seconds())
+
+
+def profile_from_claims(claims: dict) -> dict:
+    return {"id": claims["sub"], **{claim: claims[claim] for claim in PROFILE_CLAIMS}}
@@ -0,0 +1,94 @@
+"""Benchmark: cost of the JWT auth layer.
+
+Compares requests per second on an unauthenticated route (/api/ping) with
+the same load on /api/auth/me, which runs the get_current_user dependency.
+/api/auth/me is driven twice: with one token reused by every request (the
+verified-token cache answers) and with a distinct token per request (every
+request pays for the HMAC check and claim decoding). Raw verification rates
+are reported for both paths as well.
+
+    python benchmarks/bench_auth.py --requests 5000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from inprocess import server, start_app, stop_app
+
+
+async def drive(client, path, headers_for, total, concurrency):
+    remaining = iter(range(total))
+
+    async def worker():
+        for i in remaining:
+            response = await client.get(path, headers=headers_for(i))
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+def verification_rate(tokens):
+    service = server.token_service
+    service._verified.clear()
+    started = time.perf_counter()
+    for token in tokens:
+        service.verify(token)
+    return len(tokens) / (time.perf_counter() - started)
+
+
+async def run(total, concurrency):
+    client = await start_app()
+    try:
+        login = await client.post("/api/auth/login", json={"username": "admin", "password": "Admin123!"})
+        user = login.json()["user"]
+        # Signed up front so that only verification is timed
+        tokens = [server.token_service.issue_pair(user)["accessToken"] for _ in range(total)]
+
+        def no_headers(i):
+            return {}
+
+        def same_token(i):
+            return {"Authorization": f"Bearer {tokens[0]}"}
+
+        def distinct_tokens(i):
+            return {"Authorization": f"Bearer {tokens[i]}"}
+
+        await drive(client, "/api/ping", no_headers, min(total, 200), concurrency)
+        baseline = await drive(client, "/api/ping", no_headers, total, concurrency)
+        cached = await drive(client, "/api/auth/me", same_token, total, concurrency)
+        server.token_service._verified.clear()
+        uncached = await drive(client, "/api/auth/me", distinct_tokens, total, concurrency)
+
+        cached_verify_rate = verification_rate([tokens[0]] * total)
+        uncached_verify_rate = verification_rate(tokens)
+    finally:
+        await stop_app(client)
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "unauthenticatedRps": round(baseline, 1),
+        "authenticatedCachedRps": round(cached, 1),
+        "authenticatedUncachedRps": round(uncached, 1),
+        "cachedOverheadPercent": round((baseline / cached - 1) * 100, 1),
+        "uncachedOverheadPercent": round((baseline / uncached - 1) * 100, 1),
+        "cachedVerificationsPerSecond": round(cached_verify_rate, 1),
+        "uncachedVerificationsPerSecond": round(uncached_verify_rate, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    print(json.dumps(asyncio.run(run(args.requests, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Micro-benchmark: 10k bookings spread over 30 days.
+
+Prints the mean booking latency for each block of 1000 bookings. With the
+slot-counter design the numbers should stay flat as the collection grows
+when run against a real server; mongomock-motor checks unique indexes by
+scanning, so its numbers creep up with the collection size.
+
+    python benchmarks/bench_reservations.py                      # mongomock-motor
+    python benchmarks/bench_reservations.py --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from reservations import CapacityError, ReservationEngine  # noqa: E402
+
+
+def open_database(mongo_url):
+    if mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongo_url)
+        return client, client["dounie_cuisine_bench"]
+    from mongomock_motor import AsyncMongoMockClient
+    client = AsyncMongoMockClient()
+    return client, client["dounie_cuisine_bench"]
+
+
+async def run(bookings: int, days: int, block: int, mongo_url):
+    client, db = open_database(mongo_url)
+    await db["reservations"].drop()
+    await db["reservation_slots"].drop()
+    engine = ReservationEngine(db, seats_per_slot=400)
+    await engine.ensure_indexes()
+
+    rng = random.Random(42)
+    first_day = datetime(2030, 1, 1, 17, 0)
+    blocks = []
+    refused = 0
+    started = time.perf_counter()
+    for i in range(bookings):
+        data = {
+            "guestName": f"Guest {i}",
+            "guestEmail": f"guest{i}@example.com",
+            "guestPhone": "514-555-0123",
+            "partySize": rng.randint(1, 8),
+            "dateTime": first_day + timedelta(days=rng.randrange(days), minutes=15 * rng.randrange(20)),
+            "durationMinutes": 120,
+        }
+        try:
+            await engine.create(data)
+        except CapacityError:
+            refused += 1
+        if (i + 1) % block == 0:
+            elapsed = time.perf_counter() - started
+            blocks.append({"bookings": i + 1, "meanMs": round(elapsed / block * 1000, 4)})
+            started = time.perf_counter()
+
+    if mongo_url:
+        await db["reservations"].drop()
+        await db["reservation_slots"].drop()
+    client.close()
+    return {"bookings": bookings, "days": days, "refused": refused, "blocks": blocks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--block", type=int, default=1000)
+    parser.add_argument("--mongo-url", default=None)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.bookings, args.days, args.block, args.mongo_url))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
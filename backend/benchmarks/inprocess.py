@@ -0,0 +1,27 @@
+"""Run the FastAPI app in-process against mongomock-motor."""
+import os
+import secrets
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Every benchmark request comes from one client; measure the endpoints, not the limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(48))
+
+import httpx  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import server  # noqa: E402
+
+
+async def start_app() -> httpx.AsyncClient:
+    """Point the app at an in-memory Mongo, run startup and return a client"""
+    server.AsyncIOMotorClient = AsyncMongoMockClient
+    await server.startup_event()
+    transport = httpx.ASGITransport(app=server.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+
+
+async def stop_app(client: httpx.AsyncClient):
+    await client.aclose()
+    await server.shutdown_event()
@@ -0,0 +1,209 @@
+"""Load test for the FastAPI backend.
+
+Drives the main endpoints at a fixed concurrency and reports throughput and
+p50/p95/p99 latency as JSON (same layout spirit as ``test-report.json``).
+By default the app runs in-process through httpx's ASGI transport on top of
+mongomock-motor, so no network or MongoDB is needed; ``--base-url`` targets
+a running uvicorn instead (start it with ``RATE_LIMIT_ENABLED=false``, or the
+login scenario will mostly measure 429 responses).
+
+    python benchmarks/loadtest.py                                # in-process
+    python benchmarks/loadtest.py --base-url http://localhost:8001
+    python benchmarks/loadtest.py --baseline benchmarks/baseline.json
+    python benchmarks/loadtest.py --write-baseline benchmarks/baseline.json
+
+With ``--baseline`` the exit status is 1 when a scenario's p95 latency or
+throughput is worse than the stored value by more than ``--tolerance``
+(and p95 by more than ``LATENCY_SLACK_MS``).
+Scenarios in ``REFERENCE_ONLY`` (login, bound by bcrypt's deliberate cost)
+are reported but only their error count is compared.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import httpx
+
+# Login runs bcrypt on purpose; it gets a fraction of the request budget
+LOGIN_SHARE = 10
+# Dominated by bcrypt and the CPU count, not by the code under test
+REFERENCE_ONLY = ("auth_login",)
+# p95 differences below this are scheduling noise on sub-millisecond scenarios
+LATENCY_SLACK_MS = 1.0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def menu(client, i):
+    return client.get("/api/menu")
+
+
+def login(client, i):
+    return client.post("/api/auth/login", json={"username": "admin", "password": "Admin123!"})
+
+
+def reservations(client, i):
+    if i % 2:
+        return client.get("/api/reservations", params={"limit": 50})
+    moment = datetime(2031, 1, 1, 17, 0) + timedelta(days=i % 365, minutes=30 * (i // 365 % 8))
+    return client.post("/api/reservations", json={
+        "guestName": f"Load {i}",
+        "guestEmail": f"load{i}@example.com",
+        "guestPhone": "514-555-0123",
+        "partySize": 2,
+        "dateTime": moment.isoformat(),
+    })
+
+
+def quotes(client, i):
+    if i % 2:
+        return client.get("/api/quotes", params={"limit": 50})
+    return client.post("/api/quotes", json={
+        "clientName": f"Load {i}",
+        "items": [{"menuItemId": "1", "quantity": 10}, {"menuItemId": "2", "quantity": 5}],
+    })
+
+
+def dashboard(client, i):
+    return client.get("/api/dashboard/stats")
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "menu": menu,
+    "auth_login": login,
+    "reservations": reservations,
+    "quotes": quotes,
+    "dashboard_stats": dashboard,
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, request: Callable, total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await request(client, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+        },
+    }
+
+
+async def run(args) -> dict:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30.0)
+        stop = client.aclose
+    else:
+        from inprocess import start_app, stop_app
+        client = await start_app()
+
+        async def stop():
+            await stop_app(client)
+
+    results = {}
+    try:
+        # Listings and dashboard stats require a staff token; every scenario sends it
+        response = await login(client, 0)
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['accessToken']}"
+        for name in args.scenarios:
+            total = max(1, args.requests // LOGIN_SHARE) if name == "auth_login" else args.requests
+            await run_scenario(client, SCENARIOS[name], min(total, args.warmup), args.concurrency)
+            results[name] = await run_scenario(client, SCENARIOS[name], total, args.concurrency)
+    finally:
+        await stop()
+
+    return {
+        "test_date": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "reference_only": [name for name in REFERENCE_ONLY if name in results],
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return one message per scenario that regressed against the baseline"""
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference:
+            continue
+        if result["errors"] > reference.get("errors", 0):
+            regressions.append(f"{name}: {result['errors']} errors")
+        if name in REFERENCE_ONLY:
+            continue
+        p95, reference_p95 = result["latency_ms"]["p95"], reference["latency_ms"]["p95"]
+        if p95 > max(reference_p95 * (1 + tolerance), reference_p95 + LATENCY_SLACK_MS):
+            regressions.append(f"{name}: p95 {p95} ms > baseline {reference_p95} ms")
+        rps, reference_rps = result["throughput_rps"], reference["throughput_rps"]
+        if rps < reference_rps * (1 - tolerance):
+            regressions.append(f"{name}: {rps} req/s < baseline {reference_rps} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--baseline", help="fail when results regress against this report")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--write-baseline", help="save this run as the new baseline")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    report = asyncio.run(run(args))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+    report["overall_status"] = "REGRESSION" if regressions else "PASS"
+    report["regressions"] = regressions
+
+    text = json.dumps(report, indent=4)
+    print(text)
+    for path in filter(None, (args.output, args.write_baseline)):
+        with open(path, "w") as handle:
+            handle.write(text + "\n")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
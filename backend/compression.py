@@ -0,0 +1,128 @@
+"""Size-thresholded brotli/gzip response compression.
+
+Only complete (single-message) responses above ``minimum_size`` with a
+compressible content type are encoded; streamed bodies, 304s and responses
+that already carry a Content-Encoding go out untouched. Brotli is used when
+the ``brotli`` package is installed and the client accepts it, gzip
+otherwise. A strong ETag becomes weak once the body is re-encoded.
+Handlers that cache their own compressed bodies set Content-Encoding
+themselves and are passed through.
+"""
+import gzip
+from typing import List, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large JSON/text responses"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._should_compress(start_message, body):
+                # Streaming or small response: send as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            compressed = self._compress(body, encoding)
+            await send({**start_message, "headers": self._headers(start_message["headers"], encoding, len(compressed))})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, start_message, body: bytes) -> bool:
+        if len(body) < self.minimum_size or start_message["status"] in (204, 304):
+            return False
+        content_type = b""
+        for name, value in start_message["headers"]:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        return compress(body, encoding, self.gzip_level, self.brotli_quality)
+
+    @staticmethod
+    def _headers(headers: List, encoding: str, length: int) -> List:
+        result = []
+        vary_set = False
+        for name, value in headers:
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            if name == b"vary":
+                vary_set = True
+                if b"accept-encoding" not in value.lower():
+                    value = value + b", Accept-Encoding"
+            result.append((name, value))
+        if not vary_set:
+            result.append((b"vary", b"Accept-Encoding"))
+        result.append((b"content-encoding", encoding.encode()))
+        result.append((b"content-length", str(length).encode()))
+        return result
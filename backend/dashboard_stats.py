@@ -0,0 +1,206 @@
+"""Incrementally maintained dashboard statistics.
+
+Each write adds its contribution with ``$inc``, so the dashboard never scans
+orders or reservations:
+
+* flows (orders, revenue, quotes) go to a per-day rollup document in
+  ``daily_stats`` (``_id`` = ``YYYY-MM-DD``) and are summed over the
+  requested range, one small document per day;
+* gauges (pending reservations, active menu items) are running totals kept
+  in a single ``dashboard_meta`` document and always reflect the present.
+
+If a counter drifts, ``python dashboard_stats.py rebuild`` recomputes the
+rollups from the raw collections while the application keeps writing.
+"""
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+FLOW_FIELDS = ("totalOrders", "revenueCents", "totalQuotes")
+GAUGE_FIELDS = ("pendingReservations", "activeMenuItems")
+GAUGES_ID = "gauges"
+REBUILD_LOCK_ID = "rebuild_lock"
+
+
+class RebuildInProgress(Exception):
+    """Raised when another process is already rebuilding the counters"""
+
+
+def day_key(moment: Optional[datetime] = None) -> str:
+    return (moment or datetime.utcnow()).strftime("%Y-%m-%d")
+
+
+def to_cents(amount) -> int:
+    return int(round(float(amount) * 100))
+
+
+class DashboardStats:
+    """Daily rollups and running gauges updated with $inc on every write"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rollups = db["daily_stats"]
+        self.meta = db["dashboard_meta"]
+
+    async def _inc(self, moment: Optional[datetime], **deltas):
+        await self.rollups.update_one({"_id": day_key(moment)}, {"$inc": deltas}, upsert=True)
+
+    async def _inc_gauges(self, **deltas):
+        await self.meta.update_one({"_id": GAUGES_ID}, {"$inc": deltas}, upsert=True)
+
+    async def initialized(self) -> bool:
+        return await self.meta.count_documents({"_id": GAUGES_ID}, limit=1) > 0
+
+    async def record_order(self, total_amount, moment: Optional[datetime] = None):
+        await self._inc(moment, totalOrders=1, revenueCents=to_cents(total_amount))
+
+    async def record_quote(self, moment: Optional[datetime] = None):
+        await self._inc(moment, totalQuotes=1)
+
+    async def record_reservation(self, status: str = "pending"):
+        if status == "pending":
+            await self._inc_gauges(pendingReservations=1)
+
+    async def record_menu_item(self, is_available: bool = True):
+        if is_available:
+            await self._inc_gauges(activeMenuItems=1)
+
+    async def summary(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> dict:
+        """Sum the flows of a date range (inclusive on both ends) and read the gauges"""
+        days = {}
+        if date_from is not None:
+            days["$gte"] = date_from.isoformat()
+        if date_to is not None:
+            days["$lte"] = date_to.isoformat()
+
+        totals = dict.fromkeys(FLOW_FIELDS, 0)
+        async for doc in self.rollups.find({"_id": days} if days else {}):
+            for field in FLOW_FIELDS:
+                totals[field] += doc.get(field, 0)
+        gauges = await self.meta.find_one({"_id": GAUGES_ID}) or {}
+
+        return {
+            "totalOrders": totals["totalOrders"],
+            "totalRevenue": totals["revenueCents"] / 100,
+            "totalQuotes": totals["totalQuotes"],
+            "pendingReservations": gauges.get("pendingReservations", 0),
+            "activeMenuItems": gauges.get("activeMenuItems", 0),
+        }
+
+    async def _acquire_rebuild_lock(self, owner: str, lease_seconds: float) -> bool:
+        now = datetime.utcnow()
+        try:
+            await self.meta.update_one(
+                {"_id": REBUILD_LOCK_ID, "lockedUntil": {"$lt": now}},
+                {"$set": {"owner": owner, "lockedUntil": now + timedelta(seconds=lease_seconds)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # The lock document exists and has not expired
+            return False
+
+    async def rebuild(self, batch_size: int = 500, lease_seconds: float = 600.0) -> int:
+        """Recompute the counters, unless another process is already doing it"""
+        run_id = str(ObjectId())
+        # Two concurrent rebuilds would both apply their deltas to the cutoff day and the gauges
+        if not await self._acquire_rebuild_lock(run_id, lease_seconds):
+            raise RebuildInProgress()
+        try:
+            return await self._rebuild(run_id, batch_size)
+        finally:
+            await self.meta.delete_one({"_id": REBUILD_LOCK_ID, "owner": run_id})
+
+    async def _rebuild(self, run_id: str, batch_size: int) -> int:
+        """Recompute the counters from every raw document created up to a cutoff.
+
+        Live writes keep landing while this runs, so the target is never
+        dropped: past days are replaced one document at a time (only
+        backdated writes touch them), while the cutoff day and the gauges get
+        the difference between the recomputed value and a snapshot taken at
+        the cutoff, which keeps every later ``$inc``. Only a request caught
+        between its insert and its ``$inc`` at the cutoff can be counted twice.
+        """
+        cutoff = datetime.utcnow()
+        today = day_key(cutoff)
+        today_before = await self.rollups.find_one({"_id": today}) or {}
+        gauges_before = await self.meta.find_one({"_id": GAUGES_ID}) or {}
+        # Dates are stored to the millisecond: $lte keeps documents written in the cutoff's millisecond
+        created = {"$type": "date", "$lte": cutoff}
+
+        scratch = self.db[f"daily_stats_rebuild_{run_id}"]
+        day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$createdAt"}}
+        sources = [
+            ("orders", {"status": {"$ne": "cancelled"}}, {
+                "totalOrders": {"$sum": 1},
+                "revenueCents": {"$sum": {"$multiply": ["$totalAmount", 100]}},
+            }),
+            ("quotes", {}, {"totalQuotes": {"$sum": 1}}),
+        ]
+        try:
+            for collection, match, accumulators in sources:
+                pipeline = [
+                    {"$match": {**match, "createdAt": created}},
+                    {"$group": {"_id": day, **accumulators}},
+                ]
+                cursor = self.db[collection].aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
+                async for row in cursor:
+                    fields = {key: int(round(value)) for key, value in row.items() if key != "_id"}
+                    await scratch.update_one({"_id": row["_id"]}, {"$set": fields}, upsert=True)
+
+            days = 0
+            today_after = {}
+            async for row in scratch.find({}, batch_size=batch_size):
+                days += 1
+                if row["_id"] == today:
+                    today_after = row
+                    continue
+                fields = {field: row.get(field, 0) for field in FLOW_FIELDS}
+                await self.rollups.replace_one({"_id": row["_id"]}, {**fields, "rebuildId": run_id}, upsert=True)
+            # Past days without any raw data left
+            await self.rollups.delete_many({"_id": {"$lt": today}, "rebuildId": {"$ne": run_id}})
+        finally:
+            await scratch.drop()
+
+        await self._inc(cutoff, **{
+            field: today_after.get(field, 0) - today_before.get(field, 0) for field in FLOW_FIELDS
+        })
+        gauges = {
+            "pendingReservations": await self.db["reservations"].count_documents(
+                {"status": "pending", "createdAt": created}),
+            "activeMenuItems": await self.db["menu_items"].count_documents(
+                {"isAvailable": {"$ne": False}, "createdAt": created}),
+        }
+        await self._inc_gauges(**{
+            field: gauges[field] - gauges_before.get(field, 0) for field in GAUGE_FIELDS
+        })
+        return days
+
+
+async def _rebuild_from_env():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("MONGO_URL", "mongodb://localhost:27017/dounie_cuisine"))
+    try:
+        db = client[os.getenv("DATABASE_NAME", "dounie_cuisine")]
+        try:
+            days = await DashboardStats(db).rebuild()
+        except RebuildInProgress:
+            raise SystemExit("Another rebuild is already running")
+        print(f"Rebuilt {days} daily rollups")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python dashboard_stats.py rebuild")
+    asyncio.run(_rebuild_from_env())
@@ -0,0 +1,28 @@
+"""orjson-based default response class.
+
+Returning a ``FastJSONResponse`` from an endpoint skips FastAPI's
+``jsonable_encoder`` pass entirely; Pydantic models, ``Decimal`` and
+``Decimal128`` values are handled by the orjson ``default`` hook.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from bson import Decimal128
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
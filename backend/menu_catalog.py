@@ -0,0 +1,200 @@
+"""Menu catalog stored in MongoDB and served from an in-process cache.
+
+Every item is serialized to JSON once when the catalog is loaded; a page is
+then just a join of pre-encoded byte strings. Writes bump a version counter
+kept in Mongo so that every worker notices the change within
+``refresh_seconds`` and reloads.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from compression import compress
+
+META_ID = "menu"
+
+DEFAULT_MENU_ITEMS = [
+    {
+        "_id": "1",
+        "name": "Poule nan Sos",
+        "description": "Poulet traditionnel en sauce créole",
+        "price": 24.99,
+        "category": "plats",
+        "isAvailable": True,
+    },
+    {
+        "_id": "2",
+        "name": "Riz Collé aux Pois",
+        "description": "Riz aux haricots rouges, plat national",
+        "price": 18.99,
+        "category": "plats",
+        "isAvailable": True,
+    },
+    {
+        "_id": "3",
+        "name": "Poisson Gros Sel",
+        "description": "Poisson grillé aux épices créoles",
+        "price": 28.99,
+        "category": "plats",
+        "isAvailable": True,
+    },
+]
+
+
+def _encode_item(doc: dict) -> bytes:
+    item = {"id": doc["_id"]}
+    for key, value in doc.items():
+        if key == "_id":
+            continue
+        item[key] = value.isoformat() if isinstance(value, datetime) else value
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CatalogPage:
+    """A cached, already-encoded page of the menu"""
+
+    __slots__ = ("body", "etag", "total", "_compressed")
+
+    def __init__(self, body: bytes, total: int):
+        self.body = body
+        self.total = total
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self._compressed: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """The body as sent with ``encoding``, compressed once per page at the
+        middleware's levels (this runs on the event loop)"""
+        if encoding is None:
+            return self.body
+        body = self._compressed.get(encoding)
+        if body is None:
+            body = self._compressed[encoding] = compress(self.body, encoding)
+        return body
+
+
+class MenuCatalog:
+    """Versioned menu catalog with pre-serialized pages"""
+
+    def __init__(self, db, refresh_seconds: float = 2.0):
+        self.items = db["menu_items"]
+        self.meta = db["catalog_meta"]
+        self.refresh_seconds = refresh_seconds
+        self.version: Optional[int] = None
+        self._encoded: List[bytes] = []
+        self._by_category: Dict[str, List[int]] = {}
+        # Whole-menu and whole-category pages only, so query parameters cannot grow it
+        self._pages: Dict[Optional[str], CatalogPage] = {}
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def ensure_indexes(self):
+        await self.items.create_index([("category", ASCENDING), ("createdAt", ASCENDING)])
+
+    async def seed(self, items: List[dict] = DEFAULT_MENU_ITEMS):
+        """Insert the default menu when the collection is empty"""
+        if await self.items.count_documents({}, limit=1):
+            return
+        now = datetime.utcnow()
+        inserted = 0
+        for item in items:
+            fields = {key: value for key, value in item.items() if key != "_id"}
+            # Upserts, so workers seeding the same empty database at once do not collide
+            try:
+                result = await self.items.update_one(
+                    {"_id": item["_id"]}, {"$setOnInsert": {**fields, "createdAt": now}}, upsert=True
+                )
+            except DuplicateKeyError:
+                continue
+            if result.upserted_id is not None:
+                inserted += 1
+        if inserted:
+            await self._bump_version()
+
+    async def _bump_version(self) -> int:
+        meta = await self.meta.find_one_and_update(
+            {"_id": META_ID},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return meta["version"]
+
+    async def _current_version(self) -> int:
+        meta = await self.meta.find_one({"_id": META_ID})
+        return meta["version"] if meta else 0
+
+    async def _reload(self, version: int):
+        encoded: List[bytes] = []
+        by_category: Dict[str, List[int]] = {}
+        cursor = self.items.find({}).sort([("createdAt", ASCENDING), ("_id", ASCENDING)])
+        async for doc in cursor:
+            by_category.setdefault(doc.get("category"), []).append(len(encoded))
+            encoded.append(_encode_item(doc))
+        self._encoded = encoded
+        self._by_category = by_category
+        self._pages = {}
+        self.version = version
+
+    async def refresh(self, force: bool = False):
+        """Reload the cache if another writer bumped the version"""
+        now = time.monotonic()
+        if not force and self.version is not None and now - self._checked_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if not force and self.version is not None and now - self._checked_at < self.refresh_seconds:
+                return
+            version = await self._current_version()
+            if force or version != self.version:
+                await self._reload(version)
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        self.version = None
+
+    async def get_page(self, category: Optional[str] = None, offset: int = 0,
+                       limit: Optional[int] = None) -> CatalogPage:
+        """A page of the menu; unpaginated pages of known categories are cached"""
+        await self.refresh()
+        cacheable = offset == 0 and limit is None and (category is None or category in self._by_category)
+        page = self._pages.get(category) if cacheable else None
+        if page is not None:
+            return page
+
+        if category is None:
+            selected = self._encoded
+        else:
+            selected = [self._encoded[i] for i in self._by_category.get(category, [])]
+        end = None if limit is None else offset + limit
+        page = CatalogPage(b"[" + b",".join(selected[offset:end]) + b"]", len(selected))
+        if cacheable:
+            self._pages[category] = page
+        return page
+
+    async def create_item(self, data: dict) -> dict:
+        doc = {"_id": str(ObjectId()), **data, "createdAt": datetime.utcnow()}
+        await self.items.insert_one(doc)
+        await self._bump_version()
+        self.invalidate()
+        return doc
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,183 @@
+"""Request and MongoDB metrics in Prometheus text format.
+
+``MetricsMiddleware`` is a plain ASGI middleware (no per-request task or
+body buffering) that records request counts by status class and a latency
+histogram per route template. ``MongoCommandMetrics`` is a pymongo command
+listener; pymongo calls it from Motor's worker threads, hence the lock.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Counters and histograms for HTTP requests and Mongo commands"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.mongo_latency: Dict[str, Histogram] = {}
+        self.mongo_failures: Dict[str, int] = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        status_class = f"{status // 100}xx"
+        with self.lock:
+            key = (method, route, status_class)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get((method, route))
+            if histogram is None:
+                histogram = self.latency[(method, route)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_mongo(self, command: str, seconds: float, failed: bool = False):
+        with self.lock:
+            histogram = self.mongo_latency.get(command)
+            if histogram is None:
+                histogram = self.mongo_latency[command] = Histogram(MONGO_BUCKETS)
+            histogram.observe(seconds)
+            if failed:
+                self.mongo_failures[command] = self.mongo_failures.get(command, 0) + 1
+
+    def render(self) -> str:
+        with self.lock:
+            lines = [
+                "# HELP dounie_uptime_seconds Seconds since the process started",
+                "# TYPE dounie_uptime_seconds gauge",
+                f"dounie_uptime_seconds {time.time() - self.started_at:.0f}",
+                "# HELP dounie_http_requests_total HTTP requests by route and status class",
+                "# TYPE dounie_http_requests_total counter",
+            ]
+            for (method, route, status_class), count in sorted(self.requests.items()):
+                lines.append(
+                    f'dounie_http_requests_total{{method="{method}",route="{route}",status="{status_class}"}} {count}'
+                )
+            lines += [
+                "# HELP dounie_http_request_duration_seconds HTTP request latency",
+                "# TYPE dounie_http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines += histogram.render("dounie_http_request_duration_seconds", f'method="{method}",route="{route}"')
+            lines += [
+                "# HELP dounie_mongo_command_duration_seconds MongoDB command latency",
+                "# TYPE dounie_mongo_command_duration_seconds histogram",
+            ]
+            for command, histogram in sorted(self.mongo_latency.items()):
+                lines += histogram.render("dounie_mongo_command_duration_seconds", f'command="{command}"')
+            lines += [
+                "# HELP dounie_mongo_command_failures_total Failed MongoDB commands",
+                "# TYPE dounie_mongo_command_failures_total counter",
+            ]
+            for command, count in sorted(self.mongo_failures.items()):
+                lines.append(f'dounie_mongo_command_failures_total{{command="{command}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and files it under its route template"""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # FastAPI stores the matched route in the scope; unmatched paths share
+            # one label so random URLs cannot blow up the series count
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.registry.observe_request(scope["method"], path, status_code, time.perf_counter() - started)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the registry"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.registry.observe_mongo(event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.registry.observe_mongo(event.command_name, event.duration_micros / 1e6, failed=True)
+
+
+class ReadinessProbe:
+    """Pings MongoDB with a short timeout and caches the answer for a few seconds"""
+
+    def __init__(self, timeout: float = 1.0, cache_seconds: float = 5.0):
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._checked_at = 0.0
+        self._ready = False
+        self._error: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def check(self, client) -> Tuple[bool, Optional[str]]:
+        if time.monotonic() - self._checked_at < self.cache_seconds:
+            return self._ready, self._error
+        async with self._lock:
+            # Concurrent probes wait for the one ping already in flight
+            if time.monotonic() - self._checked_at < self.cache_seconds:
+                return self._ready, self._error
+            try:
+                if client is None:
+                    raise RuntimeError("no MongoDB client")
+                await asyncio.wait_for(client.admin.command("ping"), timeout=self.timeout)
+                self._ready, self._error = True, None
+            except Exception as e:
+                self._ready, self._error = False, f"{type(e).__name__}: {e}"
+            self._checked_at = time.monotonic()
+        return self._ready, self._error
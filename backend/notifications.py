@@ -0,0 +1,288 @@
+"""Outbound notification queue.
+
+Jobs live in ``notification_jobs``. Request handlers only insert a job;
+a pool of asyncio workers claims jobs with ``find_one_and_update`` (so two
+workers, in the same process or not, never take the same job), renders the
+message and hands it to a transport. Failures are retried with exponential
+backoff and, after ``max_attempts``, moved to ``notification_dead_letters``.
+"""
+import asyncio
+import logging
+import os
+import smtplib
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+PROCESSING = "processing"
+SENT = "sent"
+
+
+class LogTransport:
+    """Writes messages to the application log"""
+
+    async def send(self, message: EmailMessage):
+        logger.info(f"Notification to {message['To']}: {message['Subject']}")
+
+
+class FileTransport:
+    """Drops each message as an .eml file, handy for tests and staging"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    async def send(self, message: EmailMessage):
+        path = os.path.join(self.directory, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.eml")
+        await asyncio.to_thread(self._write, path, message.as_bytes())
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        with open(path, "wb") as handle:
+            handle.write(data)
+
+
+class SmtpTransport:
+    """Sends through an SMTP server; smtplib is blocking so it runs in a thread"""
+
+    def __init__(self, host: str, port: int = 587, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: bool = True, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    async def send(self, message: EmailMessage):
+        await asyncio.to_thread(self._send, message)
+
+    def _send(self, message: EmailMessage):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+
+def transport_from_env():
+    kind = os.getenv("NOTIFICATION_TRANSPORT", "log")
+    if kind == "smtp":
+        return SmtpTransport(
+            os.getenv("SMTP_HOST", "localhost"),
+            int(os.getenv("SMTP_PORT", "587")),
+            os.getenv("SMTP_USERNAME"),
+            os.getenv("SMTP_PASSWORD"),
+            os.getenv("SMTP_USE_TLS", "true").lower() == "true",
+        )
+    if kind == "file":
+        return FileTransport(os.getenv("NOTIFICATION_OUTBOX", "outbox"))
+    return LogTransport()
+
+
+def render_quote_message(quote: dict, to: str, sender: str) -> EmailMessage:
+    """Plain-text rendering of a stored quote"""
+    name = quote.get("clientName")
+    lines = [
+        f"Bonjour {name}," if name else "Bonjour,",
+        "",
+        f"Veuillez trouver ci-dessous votre devis {quote['quoteNumber']}.",
+        "",
+    ]
+    for item in quote["items"]:
+        lines.append(f"  {item['quantity']} x {item['description']} @ {item['unitPrice']} $ = {item['total']} $")
+    lines += [
+        "",
+        f"Sous-total : {quote['subtotalHT']} $",
+        f"Rabais : {quote['discountAmount']} $",
+        f"TPS : {quote['gstAmount']} $",
+        f"TVQ : {quote['qstAmount']} $",
+        f"Total : {quote['totalTTC']} $",
+        "",
+        f"Devis valide jusqu'au {quote['validityDate']}.",
+        "",
+        "Dounie Cuisine",
+    ]
+    message = EmailMessage()
+    message["Subject"] = f"Votre devis Dounie Cuisine {quote['quoteNumber']}"
+    message["From"] = sender
+    message["To"] = to
+    message.set_content("\n".join(lines))
+    return message
+
+
+class NotificationQueue:
+    """Mongo-backed job queue with retries and a dead-letter collection"""
+
+    def __init__(self, db, max_attempts: int = 5, backoff_seconds: float = 30.0,
+                 max_backoff_seconds: float = 3600.0, lease_seconds: float = 300.0):
+        self.jobs = db["notification_jobs"]
+        self.dead_letters = db["notification_dead_letters"]
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.wakeup = asyncio.Event()
+        self.latencies: Deque[float] = deque(maxlen=1000)
+        self.delivered = 0
+        self.failed = 0
+
+    async def ensure_indexes(self):
+        await self.jobs.create_index([("status", ASCENDING), ("runAt", ASCENDING)])
+        await self.jobs.create_index("finishedAt", expireAfterSeconds=7 * 24 * 3600)
+
+    async def enqueue(self, kind: str, payload: dict) -> str:
+        now = datetime.utcnow()
+        job_id = str(ObjectId())
+        await self.jobs.insert_one({
+            "_id": job_id,
+            "kind": kind,
+            "payload": payload,
+            "status": QUEUED,
+            "attempts": 0,
+            "runAt": now,
+            "createdAt": now,
+        })
+        self.wakeup.set()
+        return job_id
+
+    async def claim(self, worker_id: str) -> Optional[dict]:
+        """Take the oldest due job, or one whose worker died mid-lease"""
+        now = datetime.utcnow()
+        return await self.jobs.find_one_and_update(
+            {"$or": [
+                {"status": QUEUED, "runAt": {"$lte": now}},
+                {"status": PROCESSING, "leaseUntil": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": PROCESSING,
+                    "claimedBy": worker_id,
+                    "leaseUntil": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("runAt", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def complete(self, job: dict):
+        now = datetime.utcnow()
+        await self.jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"status": SENT, "finishedAt": now}, "$unset": {"leaseUntil": ""}},
+        )
+        self.delivered += 1
+        self.latencies.append((now - job["createdAt"]).total_seconds())
+
+    async def fail(self, job: dict, error: str):
+        self.failed += 1
+        if job["attempts"] >= self.max_attempts:
+            # Upsert, so a retry after a crash between these two writes does not hit a duplicate key
+            await self.dead_letters.replace_one(
+                {"_id": job["_id"]}, {**job, "lastError": error, "deadAt": datetime.utcnow()}, upsert=True
+            )
+            await self.jobs.delete_one({"_id": job["_id"]})
+            logger.error(f"Notification job {job['_id']} moved to dead letters: {error}")
+            return
+        delay = min(self.backoff_seconds * 2 ** (job["attempts"] - 1), self.max_backoff_seconds)
+        await self.jobs.update_one(
+            {"_id": job["_id"]},
+            {
+                "$set": {"status": QUEUED, "runAt": datetime.utcnow() + timedelta(seconds=delay), "lastError": error},
+                "$unset": {"leaseUntil": ""},
+            },
+        )
+        logger.warning(f"Notification job {job['_id']} failed (attempt {job['attempts']}), retry in {delay:.0f}s")
+
+    async def metrics(self) -> dict:
+        latencies = sorted(self.latencies)
+        oldest = await self.jobs.find_one({"status": QUEUED}, {"createdAt": 1}, sort=[("runAt", ASCENDING)])
+        return {
+            "queued": await self.jobs.count_documents({"status": QUEUED}),
+            "processing": await self.jobs.count_documents({"status": PROCESSING}),
+            "deadLetters": await self.dead_letters.count_documents({}),
+            "oldestQueuedSeconds": (datetime.utcnow() - oldest["createdAt"]).total_seconds() if oldest else 0,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "latencySeconds": {
+                "avg": sum(latencies) / len(latencies) if latencies else 0,
+                "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0,
+                "max": latencies[-1] if latencies else 0,
+            },
+        }
+
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class NotificationWorkerPool:
+    """asyncio workers that drain a NotificationQueue"""
+
+    def __init__(self, queue: NotificationQueue, handlers: Dict[str, Handler],
+                 concurrency: int = 2, poll_seconds: float = 1.0):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.tasks: List[asyncio.Task] = []
+        self.stopping = False
+        self.prefix = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    def start(self):
+        self.stopping = False
+        self.tasks = [asyncio.create_task(self._run(f"{self.prefix}-{i}")) for i in range(self.concurrency)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Let in-flight jobs finish, then stop claiming new ones"""
+        self.stopping = True
+        self.queue.wakeup.set()
+        if not self.tasks:
+            return
+        _, pending = await asyncio.wait(self.tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        self.tasks = []
+
+    async def _run(self, worker_id: str):
+        while not self.stopping:
+            try:
+                job = await self.queue.claim(worker_id)
+                if job is None:
+                    await self._idle()
+                    continue
+                await self._process(job)
+            except Exception as e:
+                # Never let a worker die: a job left in processing is reclaimed once its lease expires
+                logger.warning(f"Notification worker {worker_id} error: {type(e).__name__}: {e}")
+                await self._idle()
+
+    async def _idle(self):
+        self.queue.wakeup.clear()
+        try:
+            await asyncio.wait_for(self.queue.wakeup.wait(), timeout=self.poll_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _process(self, job: dict):
+        handler = self.handlers.get(job["kind"])
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"no handler for {job['kind']!r}")
+            await handler(job["payload"])
+        except Exception as e:
+            await self.queue.fail(job, f"{type(e).__name__}: {e}")
+            return
+        await self.queue.complete(job)
+        logger.info(f"Notification job {job['_id']} delivered in {time.perf_counter() - started:.3f}s")
@@ -0,0 +1,16 @@
+"""Opaque keyset cursors shared by the paginated list endpoints."""
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(moment: datetime, doc_id: str) -> str:
+    raw = f"{moment.isoformat()}|{doc_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raise ValueError when the cursor was not produced by encode_cursor"""
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    date_part, _, doc_id = raw.partition("|")
+    return datetime.fromisoformat(date_part), doc_id
@@ -0,0 +1,164 @@
+"""Quote pricing and storage.
+
+Line items are priced server side against ``menu_items`` with a single
+``$in`` lookup per quote, and Quebec taxes are computed with ``Decimal`` in
+the same way as ``calculateCanadianTaxes`` in ``api/services/accounting.ts``
+(GST 5 %, QST 9.975 %, both applied to the discounted subtotal). Amounts are
+stored as ``Decimal128`` and returned as strings, like the decimal columns of
+the Node schema.
+"""
+import secrets
+import string
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional, Tuple
+
+from bson import Decimal128, ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from pagination import decode_cursor, encode_cursor
+from reservations import utc_isoformat
+
+GST_RATE = Decimal("0.05")
+QST_RATE = Decimal("0.09975")
+CENT = Decimal("0.01")
+VALIDITY_DAYS = 30
+LIST_PROJECTION = {"items": 0, "internalNotes": 0}
+
+
+class UnknownMenuItemError(Exception):
+    """Raised when a line item refers to a menu item that does not exist"""
+
+
+def money(value) -> Decimal:
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def calculate_canadian_taxes(subtotal: Decimal) -> Dict[str, Decimal]:
+    """Each amount is rounded on its own; like the Node version, the total rounds
+    the unrounded sum, so it can be a cent off subtotal + GST + QST"""
+    gst = subtotal * GST_RATE
+    qst = subtotal * QST_RATE
+    return {"subtotal": money(subtotal), "gstAmount": money(gst), "qstAmount": money(qst),
+            "total": money(subtotal + gst + qst)}
+
+
+def _to_json(value):
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, datetime):
+        return utc_isoformat(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    return value
+
+
+def public_quote(doc: dict) -> dict:
+    return {"id": doc["_id"], **{key: _to_json(value) for key, value in doc.items() if key != "_id"}}
+
+
+class QuoteEngine:
+    """Prices, stores and lists quotes"""
+
+    def __init__(self, db):
+        self.quotes = db["quotes"]
+        self.menu_items = db["menu_items"]
+
+    async def ensure_indexes(self):
+        await self.quotes.create_index("quoteNumber", unique=True)
+        await self.quotes.create_index([("createdAt", DESCENDING), ("_id", DESCENDING)])
+        await self.quotes.create_index([("status", ASCENDING), ("createdAt", DESCENDING)])
+        await self.quotes.create_index([("clientId", ASCENDING), ("createdAt", DESCENDING)])
+
+    async def price_items(self, items: List[dict]) -> Tuple[List[dict], Decimal]:
+        """Resolve menu prices in one query and return the priced lines and subtotal"""
+        menu_ids = list({item["menuItemId"] for item in items})
+        cursor = self.menu_items.find({"_id": {"$in": menu_ids}}, {"name": 1, "price": 1})
+        prices = {doc["_id"]: doc async for doc in cursor}
+
+        missing = [menu_id for menu_id in menu_ids if menu_id not in prices]
+        if missing:
+            raise UnknownMenuItemError(", ".join(sorted(missing)))
+
+        lines = []
+        subtotal = Decimal("0")
+        for item in items:
+            menu_item = prices[item["menuItemId"]]
+            unit_price = money(menu_item["price"])
+            total = unit_price * item["quantity"]
+            subtotal += total
+            lines.append({
+                "menuItemId": item["menuItemId"],
+                "description": item.get("description") or menu_item["name"],
+                "quantity": item["quantity"],
+                "unitPrice": Decimal128(unit_price),
+                "total": Decimal128(total),
+            })
+        return lines, subtotal
+
+    async def create(self, data: dict) -> dict:
+        lines, subtotal = await self.price_items(data.pop("items"))
+        discount = min(money(data.pop("discountAmount", 0) or 0), subtotal)
+        taxes = calculate_canadian_taxes(subtotal - discount)
+        now = datetime.utcnow()
+        suffix = "".join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(6))
+
+        doc = {
+            "_id": str(ObjectId()),
+            **data,
+            "quoteNumber": f"DC-{now:%Y%m%d}-{suffix}",
+            "status": "draft",
+            "validityDate": data.get("validityDate") or (now + timedelta(days=VALIDITY_DAYS)).date().isoformat(),
+            "items": lines,
+            "subtotalHT": Decimal128(money(subtotal)),
+            "discountAmount": Decimal128(discount),
+            "gstAmount": Decimal128(taxes["gstAmount"]),
+            "qstAmount": Decimal128(taxes["qstAmount"]),
+            "taxAmount": Decimal128(taxes["gstAmount"] + taxes["qstAmount"]),
+            "totalTTC": Decimal128(taxes["total"]),
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        await self.quotes.insert_one(doc)
+        return doc
+
+    async def get(self, quote_id: str) -> Optional[dict]:
+        return await self.quotes.find_one({"_id": quote_id})
+
+    async def mark_sent(self, quote_id: str):
+        now = datetime.utcnow()
+        await self.quotes.update_one(
+            {"_id": quote_id, "status": "draft"},
+            {"$set": {"status": "sent", "sentAt": now, "updatedAt": now}},
+        )
+
+    async def list(self, status: Optional[str] = None, client_id: Optional[str] = None,
+                   cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[dict], Optional[str]]:
+        """Newest first, without line items; returns the page and the next cursor"""
+        query: dict = {}
+        if status:
+            query["status"] = status
+        if client_id:
+            query["clientId"] = client_id
+        if cursor:
+            before_date, before_id = decode_cursor(cursor)
+            query["$or"] = [
+                {"createdAt": {"$lt": before_date}},
+                {"createdAt": before_date, "_id": {"$lt": before_id}},
+            ]
+
+        docs = await (
+            self.quotes.find(query, LIST_PROJECTION)
+            .sort([("createdAt", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        next_cursor = None
+        if len(docs) > limit:
+            last = docs[limit - 1]
+            next_cursor = encode_cursor(last["createdAt"], last["_id"])
+        return docs[:limit], next_cursor
@@ -0,0 +1,168 @@
+"""Request rate limiting for the public authentication endpoints.
+
+Limits use a sliding-window counter: hits are counted in fixed windows and
+the previous window is weighted by how much of it still overlaps the
+sliding window, which is accurate to a few percent while costing one
+counter per key and window. ``hit`` checks and counts in one step;
+``check`` only reports whether a hit would be allowed, for callers that
+count selected outcomes (failed logins) afterwards. ``MemoryRateLimiter``
+keeps the counters in the process; ``MongoRateLimiter`` keeps them in
+``rate_limits`` (TTL index on
+``expiresAt``) so that every worker shares the same budget. Denied hits are
+not counted, so a client that backs off for ``Retry-After`` seconds gets
+through again.
+"""
+import math
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+
+class RateLimit:
+    """At most ``limit`` hits per ``window`` seconds for each key"""
+
+    __slots__ = ("name", "limit", "window")
+
+    def __init__(self, name: str, limit: int, window: float):
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateLimit":
+        """Build a limit from a ``"<hits>/<seconds>"`` string such as ``"10/60"``"""
+        limit, _, window = spec.partition("/")
+        return cls(name, int(limit), float(window))
+
+
+def _window(rule: RateLimit, now: float) -> Tuple[int, float]:
+    index = int(now // rule.window)
+    return index, now - index * rule.window
+
+
+def _allowed(rule: RateLimit, elapsed: float, previous: int, current: int) -> bool:
+    weight = (rule.window - elapsed) / rule.window
+    return previous * weight + current < rule.limit
+
+
+def _retry_after(rule: RateLimit, elapsed: float, previous: int, current: int) -> float:
+    """Seconds until the estimate drops below the limit, assuming no new hits"""
+    if current < rule.limit and previous:
+        # The previous window fades out before this one ends
+        return rule.window * (1 - (rule.limit - current) / previous) - elapsed
+    # This window is full: wait for it to become the (fading) previous one
+    return rule.window - elapsed + rule.window * (1 - rule.limit / current)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+class MemoryRateLimiter:
+    """Per-process counters; each worker enforces the limit on its own"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> [window index, current count, previous count, expires at]
+        self.counters: Dict[str, List] = {}
+
+    async def ensure_indexes(self):
+        pass
+
+    def _counter(self, rule: RateLimit, key: str, now: float, index: int) -> List:
+        counter_key = f"{rule.name}:{key}"
+        counter = self.counters.get(counter_key)
+        if counter is None or counter[0] < index - 1:
+            counter = [index, 0, 0, 0.0]
+            if len(self.counters) >= self.max_keys:
+                self._prune(now)
+            self.counters[counter_key] = counter
+        elif counter[0] == index - 1:
+            counter[:3] = [index, 0, counter[1]]
+        return counter
+
+    async def check(self, rule: RateLimit, key: str) -> float:
+        """Return 0 when a hit would be allowed, else the seconds to wait"""
+        now = time.time()
+        index, elapsed = _window(rule, now)
+        counter = self._counter(rule, key, now, index)
+        if _allowed(rule, elapsed, counter[2], counter[1]):
+            return 0.0
+        return _retry_after(rule, elapsed, counter[2], counter[1])
+
+    async def hit(self, rule: RateLimit, key: str) -> float:
+        """Count a hit; return 0 when allowed, else the seconds to wait"""
+        now = time.time()
+        index, elapsed = _window(rule, now)
+        counter = self._counter(rule, key, now, index)
+        if not _allowed(rule, elapsed, counter[2], counter[1]):
+            return _retry_after(rule, elapsed, counter[2], counter[1])
+        counter[1] += 1
+        counter[3] = (index + 2) * rule.window
+        return 0.0
+
+    def _prune(self, now: float):
+        """Drop counters whose windows no longer matter"""
+        self.counters = {key: counter for key, counter in self.counters.items() if counter[3] > now}
+        if len(self.counters) >= self.max_keys:
+            self.counters.clear()
+
+
+class MongoRateLimiter:
+    """Counters shared by all workers through MongoDB"""
+
+    def __init__(self, db):
+        self.counters = db["rate_limits"]
+
+    async def ensure_indexes(self):
+        await self.counters.create_index("expiresAt", expireAfterSeconds=0)
+
+    async def _count(self, counter_id: str) -> int:
+        doc = await self.counters.find_one({"_id": counter_id}, {"count": 1})
+        return doc["count"] if doc else 0
+
+    async def check(self, rule: RateLimit, key: str) -> float:
+        """Return 0 when a hit would be allowed, else the seconds to wait"""
+        index, elapsed = _window(rule, time.time())
+        prefix = f"{rule.name}:{key}:"
+        previous = await self._count(f"{prefix}{index - 1}")
+        current = await self._count(f"{prefix}{index}")
+        if _allowed(rule, elapsed, previous, current):
+            return 0.0
+        return _retry_after(rule, elapsed, previous, current)
+
+    async def hit(self, rule: RateLimit, key: str) -> float:
+        """Count a hit; return 0 when allowed, else the seconds to wait"""
+        index, elapsed = _window(rule, time.time())
+        prefix = f"{rule.name}:{key}:"
+        previous = await self._count(f"{prefix}{index - 1}")
+        budget = rule.limit - previous * (rule.window - elapsed) / rule.window
+
+        # Same conditional upsert as reservation slots: the $inc only applies
+        # while the counter is under budget, so concurrent workers cannot overshoot
+        query = {"_id": f"{prefix}{index}", "count": {"$lt": budget}}
+        update = {
+            "$inc": {"count": 1},
+            "$setOnInsert": {"expiresAt": datetime.utcfromtimestamp((index + 2) * rule.window)},
+        }
+        if budget > 0:
+            try:
+                await self.counters.update_one(query, update, upsert=True)
+                return 0.0
+            except DuplicateKeyError:
+                # Either the window is full or a concurrent request created it first
+                result = await self.counters.update_one(query, {"$inc": {"count": 1}})
+                if result.modified_count == 1:
+                    return 0.0
+
+        return _retry_after(rule, elapsed, previous, await self._count(f"{prefix}{index}"))
+
+
+def rate_limiter_from_env(db):
+    """RATE_LIMIT_BACKEND=memory|mongo; mongo (the default) is shared by every worker"""
+    if os.getenv("RATE_LIMIT_BACKEND", "mongo") == "memory":
+        return MemoryRateLimiter()
+    return MongoRateLimiter(db)
@@ -0,0 +1,151 @@
+"""Reservation engine backed by MongoDB.
+
+Seating capacity is tracked per time slot in ``reservation_slots`` (one
+document per slot, ``_id`` = ``YYYY-MM-DDTHH:MM``, indexed by day). Booking a
+table is a conditional ``$inc`` on the handful of slots the reservation
+covers, so the capacity check costs the same whether the day holds ten
+bookings or ten thousand, and two concurrent requests can never both take
+the last seat. Datetimes without an offset (what a datetime-local form
+sends) are wall-clock time at the restaurant (``local_zone``).
+"""
+import secrets
+import string
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from pagination import decode_cursor, encode_cursor
+
+SLOT_MINUTES = 30
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+
+class CapacityError(Exception):
+    """Raised when a reservation does not fit in the requested slots"""
+
+
+def to_utc_naive(value: datetime, local_zone: tzinfo = timezone.utc) -> datetime:
+    """Mongo hands back naive UTC datetimes; store and compare the same way.
+    A value without an offset is read as wall-clock time in ``local_zone``."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=local_zone)
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_isoformat(value: datetime) -> str:
+    """ISO 8601 with an explicit +00:00 offset, so clients do not read it as local time"""
+    return value.replace(tzinfo=timezone.utc).isoformat()
+
+
+def slot_keys(start: datetime, duration_minutes: int) -> List[Tuple[str, datetime]]:
+    """Return the (key, slot start) pairs covered by a reservation"""
+    first = start.replace(minute=start.minute - start.minute % SLOT_MINUTES, second=0, microsecond=0)
+    end = start + timedelta(minutes=duration_minutes)
+    slots = []
+    current = first
+    while current < end:
+        slots.append((current.strftime("%Y-%m-%dT%H:%M"), current))
+        current += timedelta(minutes=SLOT_MINUTES)
+    return slots
+
+
+class ReservationEngine:
+    """Capacity-checked reservations with cursor pagination"""
+
+    def __init__(self, db, seats_per_slot: int = 40, local_zone: tzinfo = timezone.utc):
+        self.reservations = db["reservations"]
+        self.slots = db["reservation_slots"]
+        self.seats_per_slot = seats_per_slot
+        self.local_zone = local_zone
+
+    async def ensure_indexes(self):
+        await self.reservations.create_index([("dateTime", ASCENDING), ("_id", ASCENDING)])
+        await self.reservations.create_index([("status", ASCENDING), ("dateTime", ASCENDING)])
+        await self.reservations.create_index("confirmationCode", unique=True)
+        await self.slots.create_index([("day", ASCENDING), ("start", ASCENDING)])
+
+    async def _take_slot(self, key: str, start: datetime, party_size: int) -> bool:
+        query = {"_id": key, "seats": {"$lte": self.seats_per_slot - party_size}}
+        update = {
+            "$inc": {"seats": party_size},
+            "$setOnInsert": {"day": key[:10], "start": start},
+        }
+        try:
+            await self.slots.update_one(query, update, upsert=True)
+            return True
+        except DuplicateKeyError:
+            # Either the slot is full or a concurrent request created it first
+            result = await self.slots.update_one(query, {"$inc": {"seats": party_size}})
+            return result.modified_count == 1
+
+    async def _release_slots(self, keys: List[str], party_size: int):
+        if keys:
+            await self.slots.update_many({"_id": {"$in": keys}}, {"$inc": {"seats": -party_size}})
+
+    async def create(self, data: dict) -> dict:
+        """Reserve seats in every covered slot, then store the reservation"""
+        data = {**data, "dateTime": to_utc_naive(data["dateTime"], self.local_zone)}
+        party_size = data["partySize"]
+        if party_size > self.seats_per_slot:
+            raise CapacityError("party larger than room capacity")
+
+        taken: List[str] = []
+        for key, start in slot_keys(data["dateTime"], data["durationMinutes"]):
+            if not await self._take_slot(key, start, party_size):
+                await self._release_slots(taken, party_size)
+                raise CapacityError(f"slot {key} is full")
+            taken.append(key)
+
+        now = datetime.utcnow()
+        doc = {
+            "_id": str(ObjectId()),
+            **data,
+            "status": "pending",
+            "confirmationCode": "".join(secrets.choice(CODE_ALPHABET) for _ in range(8)),
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        try:
+            await self.reservations.insert_one(doc)
+        except Exception:
+            await self._release_slots(taken, party_size)
+            raise
+        return doc
+
+    async def list(self, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                   cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[dict], Optional[str]]:
+        """Return one page of reservations ordered by date, plus the next cursor"""
+        query: dict = {}
+        date_range = {}
+        if date_from is not None:
+            date_range["$gte"] = to_utc_naive(date_from, self.local_zone)
+        if date_to is not None:
+            date_range["$lt"] = to_utc_naive(date_to, self.local_zone)
+        if date_range:
+            query["dateTime"] = date_range
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            query["$or"] = [
+                {"dateTime": {"$gt": after_date}},
+                {"dateTime": after_date, "_id": {"$gt": after_id}},
+            ]
+
+        docs = await (
+            self.reservations.find(query)
+            .sort([("dateTime", ASCENDING), ("_id", ASCENDING)])
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        next_cursor = encode_cursor(docs[limit - 1]["dateTime"], docs[limit - 1]["_id"]) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+
+
+def public_reservation(doc: dict) -> dict:
+    reservation = {"id": doc["_id"]}
+    for key, value in doc.items():
+        if key != "_id":
+            reservation[key] = utc_isoformat(value) if isinstance(value, datetime) else value
+    return reservation
@@ -0,0 +1,89 @@
+"""Production launcher for the FastAPI backend.
+
+Starts one worker process per available CPU (override with WEB_CONCURRENCY).
+Workers share nothing in memory: every piece of shared state (catalog
+version, revoked tokens, queues, rollups, rate limits) lives in MongoDB, so
+adding workers or machines needs no extra coordination. Each worker opens
+its own Motor pool, so the server sees up to
+``workers * MONGO_MAX_POOL_SIZE`` connections.
+
+With several workers, gunicorn supervises uvicorn workers: a worker that
+dies is replaced, and a worker that fails to start (MongoDB unreachable,
+for instance) stops the whole launcher with a non-zero exit code so that
+supervisor can restart it. A single worker runs under plain uvicorn, which
+exits the same way on a failed startup.
+
+    python serve.py                  # PORT=8001, one worker per CPU
+    WEB_CONCURRENCY=1 python serve.py
+"""
+import logging
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+logger = logging.getLogger("serve")
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    configured = os.getenv("WEB_CONCURRENCY")
+    workers = int(configured) if configured else available_cpus()
+    max_workers = int(os.getenv("MAX_WORKERS", "0"))
+    if max_workers:
+        workers = min(workers, max_workers)
+    return max(1, workers)
+
+
+def run_gunicorn(host: str, port: int, workers: int):
+    from gunicorn.app.base import BaseApplication
+
+    class Launcher(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", [f"{host}:{port}"])
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("forwarded_allow_ips", os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+            self.cfg.set("keepalive", int(os.getenv("KEEP_ALIVE_SECONDS", "5")))
+            # Startup (indexes, seeding, cache warm-up) must fit in the heartbeat timeout
+            self.cfg.set("timeout", int(os.getenv("WORKER_TIMEOUT", "120")))
+            self.cfg.set("loglevel", os.getenv("LOG_LEVEL", "info"))
+
+        def load(self):
+            # Imported in each worker after the fork, so every worker gets its own pool
+            from server import app
+            return app
+
+    Launcher().run()
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    workers = worker_count()
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8001"))
+    pool_size = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    logger.info(f"Starting {workers} worker(s), up to {workers * pool_size} MongoDB connections")
+    if workers > 1:
+        run_gunicorn(host, port, workers)
+        return
+    uvicorn.run(
+        "server:app",
+        host=host,
+        port=port,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE_SECONDS", "5")),
+        log_level=os.getenv("LOG_LEVEL", "info"),
+    )
+
+
+if __name__ == "__main__":
+    main()
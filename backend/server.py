@@ -1,40 +1,120 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, status, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Optional, List
+from decimal import Decimal
 import os
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
 import random
 import string
 
+from auth_store import MongoAuthStore, PasswordHasher, public_user, seed_default_users
+from auth_tokens import ACCESS, REFRESH, InvalidTokenError, TokenService, profile_from_claims
+from dashboard_stats import DashboardStats, RebuildInProgress
+from compression import CompressionMiddleware, choose_encoding
+from fast_json import FastJSONResponse
+from menu_catalog import MenuCatalog, etag_matches
+from metrics import MetricsMiddleware, MetricsRegistry, MongoCommandMetrics, ReadinessProbe
+from notifications import NotificationQueue, NotificationWorkerPool, render_quote_message, transport_from_env
+from quotes import QuoteEngine, UnknownMenuItemError, public_quote
+from rate_limit import RateLimit, rate_limiter_from_env, retry_after_header
+from reservations import CapacityError, ReservationEngine, public_reservation
+
 # Load environment variables
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# passlib 1.7.4 logs a harmless traceback when probing bcrypt >= 4.1
+logging.getLogger("passlib").setLevel(logging.ERROR)
+
+app = FastAPI(title="Dounie Cuisine API", version="1.0.0", default_response_class=FastJSONResponse)
+
+CORS_ALLOW_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:3000,http://localhost:3001").split(",")
+    if origin.strip()
+]
+CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "86400"))
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
 
-app = FastAPI(title="Dounie Cuisine API", version="1.0.0")
+# Compress large responses (innermost, so it sees the final body)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
 
-# Add CORS middleware
+# Add CORS middleware; browsers cache preflights for CORS_MAX_AGE seconds
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ALLOW_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match"],
+    expose_headers=["ETag", "X-Total-Count", "X-Next-Cursor", "Retry-After"],
+    max_age=CORS_MAX_AGE,
 )
 
+# Request metrics (outermost, so CORS handling is timed too)
+metrics_registry = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+readiness_probe = ReadinessProbe()
+
+# Keys that were committed to the repository or printed in the deployment guide
+PUBLISHED_SECRET_KEYS = {"dounie-cuisine-secret-key-2024", "remplacer-par-une-cle-generee"}
+
 # MongoDB configuration
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/dounie_cuisine")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "dounie_cuisine")
+RESERVATION_SEATS_PER_SLOT = int(os.getenv("RESERVATION_SEATS_PER_SLOT", "40"))
+# Reservation times sent without an offset are local to the restaurant
+RESTAURANT_TIMEZONE = ZoneInfo(os.getenv("RESTAURANT_TIMEZONE", "America/Montreal"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+RESET_CODE_TTL_HOURS = 24
+SECRET_KEY = os.getenv("SECRET_KEY")
+# Tokens carry the user's role, so a missing or published key would let anyone sign an admin token
+if not SECRET_KEY or SECRET_KEY in PUBLISHED_SECRET_KEYS:
+    raise RuntimeError(
+        "SECRET_KEY must be set to a private random value, "
+        "e.g. python -c 'import secrets; print(secrets.token_urlsafe(48))'"
+    )
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+REVOCATION_SYNC_SECONDS = 5
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "2"))
+NOTIFICATION_SENDER = os.getenv("NOTIFICATION_SENDER", "Dounie Cuisine <no-reply@dounie-cuisine.ca>")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+LOGIN_IP_LIMIT = RateLimit.parse("login_ip", os.getenv("RATE_LIMIT_LOGIN_IP", "20/60"))
+# Failed logins per username; kept above the per-IP rate so that one client cannot lock an account out
+LOGIN_USER_LIMIT = RateLimit.parse("login_user", os.getenv("RATE_LIMIT_LOGIN_USER", "50/60"))
+RESET_IP_LIMIT = RateLimit.parse("reset_ip", os.getenv("RATE_LIMIT_RESET_IP", "10/900"))
 
 # Global MongoDB client
 mongodb_client: Optional[AsyncIOMotorClient] = None
 database = None
+menu_catalog: Optional[MenuCatalog] = None
+reservation_engine: Optional[ReservationEngine] = None
+dashboard_stats: Optional[DashboardStats] = None
+quote_engine: Optional[QuoteEngine] = None
+notification_queue: Optional[NotificationQueue] = None
+notification_workers: Optional[NotificationWorkerPool] = None
+notification_transport = transport_from_env()
+auth_store = None
+rate_limiter = None
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS)
+token_service = TokenService(SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS)
+revocation_sync_task: Optional[asyncio.Task] = None
+bearer_scheme = HTTPBearer(auto_error=False)
 
 # Pydantic models
 class PasswordResetRequest(BaseModel):
@@ -51,6 +131,15 @@ class LoginRequest(BaseModel):
     username: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refreshToken: str
+
+class LogoutRequest(BaseModel):
+    refreshToken: Optional[str] = None
+
+class QuoteSendRequest(BaseModel):
+    email: Optional[str] = None
+
 class UserResponse(BaseModel):
     id: str
     username: str
@@ -59,16 +148,67 @@ class UserResponse(BaseModel):
     lastName: str
     role: str
 
+class MenuItemCreate(BaseModel):
+    name: str
+    description: str = ""
+    price: float = Field(ge=0)
+    category: str
+    nameEn: Optional[str] = None
+    descriptionEn: Optional[str] = None
+    isAvailable: bool = True
+    imageUrl: Optional[str] = None
+
+class ReservationCreate(BaseModel):
+    guestName: str = Field(validation_alias=AliasChoices("guestName", "customerName"))
+    guestEmail: str = Field(validation_alias=AliasChoices("guestEmail", "customerEmail"))
+    guestPhone: str = Field(validation_alias=AliasChoices("guestPhone", "customerPhone"))
+    partySize: int = Field(ge=1)
+    dateTime: datetime
+    durationMinutes: int = Field(120, ge=30, le=480)
+    specialRequests: Optional[str] = None
+    occasion: Optional[str] = None
+    dietaryRestrictions: List[str] = []
+
+class QuoteLineItem(BaseModel):
+    menuItemId: str
+    quantity: int = Field(ge=1, le=10000)
+    description: Optional[str] = None
+
+class QuoteCreate(BaseModel):
+    clientId: Optional[str] = None
+    clientName: Optional[str] = None
+    clientEmail: Optional[str] = None
+    eventDate: Optional[date] = None
+    eventLocation: Optional[str] = None
+    guestCount: Optional[int] = Field(None, ge=1)
+    validityDate: Optional[date] = None
+    items: List[QuoteLineItem] = Field(min_length=1, max_length=200)
+    discountAmount: Decimal = Field(Decimal("0"), ge=0)
+    notes: Optional[str] = None
+    internalNotes: Optional[str] = None
+
 # Database connection functions
 async def connect_to_mongo():
-    """Create database connection"""
+    """Create database connection and make sure the server answers"""
     global mongodb_client, database
+    mongodb_client = AsyncIOMotorClient(
+        MONGO_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        event_listeners=[MongoCommandMetrics(metrics_registry)],
+    )
     try:
-        mongodb_client = AsyncIOMotorClient(MONGO_URL)
-        database = mongodb_client[DATABASE_NAME]
-        logger.info("Connected to MongoDB")
+        await mongodb_client.admin.command("ping")
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
+        mongodb_client.close()
+        mongodb_client = None
+        raise
+    database = mongodb_client[DATABASE_NAME]
+    logger.info(f"Connected to MongoDB (pool size {MONGO_MAX_POOL_SIZE})")
 
 async def close_mongo_connection():
     """Close database connection"""
@@ -77,24 +217,96 @@ async def close_mongo_connection():
         mongodb_client.close()
         logger.info("Disconnected from MongoDB")
 
+async def sync_revocations():
+    """Pull logouts made on other workers into the local denylist"""
+    while True:
+        try:
+            await token_service.pull_revocations(database["revoked_tokens"])
+        except Exception as e:
+            logger.warning(f"Failed to sync revoked tokens: {e}")
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+
+async def deliver_quote(payload: dict):
+    """Notification handler: render a quote and send it"""
+    doc = await quote_engine.get(payload["quoteId"])
+    if not doc:
+        raise LookupError(f"quote {payload['quoteId']} not found")
+    message = render_quote_message(public_quote(doc), payload["to"], NOTIFICATION_SENDER)
+    await notification_transport.send(message)
+    await quote_engine.mark_sent(payload["quoteId"])
+
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
+    global menu_catalog, reservation_engine, dashboard_stats, auth_store, revocation_sync_task, quote_engine
+    global notification_queue, notification_workers, rate_limiter
     await connect_to_mongo()
+    auth_store = MongoAuthStore(database)
+    rate_limiter = rate_limiter_from_env(database)
+    menu_catalog = MenuCatalog(database)
+    reservation_engine = ReservationEngine(database, RESERVATION_SEATS_PER_SLOT, RESTAURANT_TIMEZONE)
+    dashboard_stats = DashboardStats(database)
+    quote_engine = QuoteEngine(database)
+    notification_queue = NotificationQueue(database)
+    notification_workers = NotificationWorkerPool(
+        notification_queue, {"quote": deliver_quote}, NOTIFICATION_WORKERS
+    )
+    # Any failure here aborts startup instead of serving with a half-ready database
+    await prepare_database()
+    await warm_up_caches()
+    revocation_sync_task = asyncio.create_task(sync_revocations())
+    notification_workers.start()
+
+async def prepare_database():
+    """Create indexes and seed data; idempotent and safe to run from several workers at once"""
+    await auth_store.ensure_indexes()
+    await seed_default_users(auth_store, password_hasher)
+    await token_service.ensure_indexes(database["revoked_tokens"])
+    await rate_limiter.ensure_indexes()
+    await reservation_engine.ensure_indexes()
+    await quote_engine.ensure_indexes()
+    await notification_queue.ensure_indexes()
+    await menu_catalog.ensure_indexes()
+    await menu_catalog.seed()
+    if not await dashboard_stats.initialized():
+        try:
+            await dashboard_stats.rebuild()
+        except RebuildInProgress:
+            logger.info("Dashboard rollups are being rebuilt by another worker")
+
+async def warm_up_caches():
+    """Fill per-process caches so the first requests do not pay for them"""
+    await menu_catalog.refresh(force=True)
+    await token_service.pull_revocations(database["revoked_tokens"])
+    await password_hasher.warm_up()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if revocation_sync_task:
+        revocation_sync_task.cancel()
+    if notification_workers:
+        await notification_workers.stop()
     await close_mongo_connection()
+    password_hasher.shutdown()
 
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
-    return {
-        "status": "ok", 
+    """Readiness: MongoDB is pinged at most once every few seconds"""
+    ready, error = await readiness_probe.check(mongodb_client)
+    body = {
+        "status": "ok" if ready else "degraded",
         "timestamp": datetime.now().isoformat(),
         "service": "Dounie Cuisine API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "checks": {"mongodb": "ok" if ready else error}
     }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/api/v2/health")
 def health_v2():
@@ -109,56 +321,114 @@ async def ping():
         "version": "1.0.0"
     }
 
-# In-memory storage for reset codes and user credentials
-reset_codes_storage = {}
-user_credentials = {
-    "admin": {"password": "Admin123!", "user_data": {
-        "id": "1", "username": "admin", "email": "admin@dounie-cuisine.ca",
-        "firstName": "Admin", "lastName": "Dounie", "role": "admin"
-    }},
-    "staff": {"password": "Staff123!", "user_data": {
-        "id": "2", "username": "staff", "email": "staff@dounie-cuisine.ca", 
-        "firstName": "Staff", "lastName": "Member", "role": "staff"
-    }}
-}
+# Authentication dependencies
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> dict:
+    """Validate the bearer token and return its claims (no database access)"""
+    if credentials is None:
+        raise HTTPException(
+            status_code=401, detail="Authentication required", headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return token_service.verify(credentials.credentials)
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+async def require_admin(claims: dict = Depends(get_current_user)) -> dict:
+    if claims.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return claims
+
+async def require_staff(claims: dict = Depends(get_current_user)) -> dict:
+    if claims.get("role") not in ("admin", "staff"):
+        raise HTTPException(status_code=403, detail="Staff access required")
+    return claims
+
+def client_ip(http_request: Request) -> str:
+    """Client address; uvicorn resolves X-Forwarded-For from trusted proxies"""
+    return http_request.client.host if http_request.client else "unknown"
+
+async def enforce_rate_limits(*checks, count: bool = True):
+    """Reject with 429 and Retry-After when any (limit, key) pair is over budget;
+    with count=False the budget is only checked, not spent"""
+    if not RATE_LIMIT_ENABLED:
+        return
+    for limit, key in checks:
+        if count:
+            retry_after = await rate_limiter.hit(limit, key)
+        else:
+            retry_after = await rate_limiter.check(limit, key)
+        if retry_after:
+            logger.warning(f"Rate limit {limit.name} exceeded for {key}")
+            raise HTTPException(
+                status_code=429,
+                detail="Trop de tentatives, veuillez réessayer plus tard",
+                headers={"Retry-After": retry_after_header(retry_after)},
+            )
 
 # Authentication endpoints
 @app.post("/api/auth/login", response_model=dict)
-async def login(login_data: LoginRequest):
-    """Login endpoint - improved with dynamic credentials"""
-    if login_data.username in user_credentials:
-        stored_creds = user_credentials[login_data.username]
-        if stored_creds["password"] == login_data.password:
-            return {"user": stored_creds["user_data"], "token": "fake-jwt-token"}
-    
+async def login(login_data: LoginRequest, http_request: Request):
+    """Login endpoint (rate limited per client, and per username for failures)"""
+    username_key = login_data.username.lower()[:64]
+    await enforce_rate_limits((LOGIN_IP_LIMIT, client_ip(http_request)))
+    await enforce_rate_limits((LOGIN_USER_LIMIT, username_key), count=False)
+    user = await auth_store.get_user(login_data.username)
+    password_hash = user["passwordHash"] if user else None
+    if await password_hasher.verify(login_data.password, password_hash):
+        tokens = token_service.issue_pair(user)
+        return {"user": public_user(user), "token": tokens["accessToken"], "tokenType": "bearer", **tokens}
+
+    if RATE_LIMIT_ENABLED:
+        await rate_limiter.hit(LOGIN_USER_LIMIT, username_key)
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
+@app.post("/api/auth/refresh")
+async def refresh_token(request: RefreshRequest):
+    """Exchange a refresh token for a new token pair"""
+    try:
+        claims = token_service.verify(request.refreshToken, REFRESH)
+    except InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    await token_service.revoke(claims, database["revoked_tokens"])
+    tokens = token_service.issue_pair(profile_from_claims(claims))
+    return {"token": tokens["accessToken"], "tokenType": "bearer", **tokens}
+
 @app.post("/api/auth/logout")
-async def logout():
-    """Logout endpoint"""
+async def logout(
+    request: Optional[LogoutRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+):
+    """Logout endpoint - revokes the presented tokens"""
+    tokens = [(credentials.credentials, ACCESS)] if credentials else []
+    if request and request.refreshToken:
+        tokens.append((request.refreshToken, REFRESH))
+    for token, token_type in tokens:
+        try:
+            await token_service.revoke(token_service.verify(token, token_type), database["revoked_tokens"])
+        except InvalidTokenError:
+            pass
     return {"message": "Logged out successfully"}
 
 @app.get("/api/auth/me")
-async def get_current_user():
+async def read_current_user(claims: dict = Depends(get_current_user)):
     """Get current user endpoint"""
-    return {"message": "Authentication required"}
+    return profile_from_claims(claims)
 
 # Password recovery endpoints
 @app.post("/api/admin/generate-password-reset")
-async def generate_password_reset(request: PasswordResetRequest):
+async def generate_password_reset(request: PasswordResetRequest, admin: dict = Depends(require_admin)):
     """Generate password reset code (admin only)"""
-    reset_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-    expires_at = datetime.now() + timedelta(hours=24)
-    
-    # Save code in memory
-    reset_codes_storage[reset_code] = {
-        "email": request.email,
-        "expires_at": expires_at,
-        "used": False
-    }
-    
-    logger.info(f"Generated reset code {reset_code} for {request.email}")
-    
+    reset_code = ''.join(random.SystemRandom().choices(string.ascii_uppercase + string.digits, k=8))
+    expires_at = datetime.utcnow() + timedelta(hours=RESET_CODE_TTL_HOURS)
+
+    await auth_store.add_reset_code(reset_code, request.email, expires_at)
+
+    logger.info(f"Generated reset code for {request.email}")
+
     return {
         "resetCode": reset_code,
         "expiresAt": expires_at.isoformat(),
@@ -166,143 +436,185 @@ async def generate_password_reset(request: PasswordResetRequest):
     }
 
 @app.get("/api/admin/password-reset-codes")
-async def get_password_reset_codes():
+async def get_password_reset_codes(admin: dict = Depends(require_admin)):
     """List active reset codes (admin only)"""
-    active_codes = []
-    for code, data in reset_codes_storage.items():
-        if data["expires_at"] > datetime.now() and not data["used"]:
-            active_codes.append({
-                "code": code,
-                "email": data["email"],
-                "expiresAt": data["expires_at"].isoformat(),
-                "used": data["used"]
-            })
-    
-    return active_codes
+    return [
+        {
+            "code": data["_id"],
+            "email": data["email"],
+            "expiresAt": data["expires_at"].isoformat(),
+            "used": data["used"]
+        }
+        for data in await auth_store.list_active_codes()
+    ]
 
 @app.post("/api/auth/verify-reset-code")
-async def verify_reset_code(request: PasswordResetVerify):
-    """Verify reset code (public endpoint)"""
-    if request.code in reset_codes_storage:
-        code_data = reset_codes_storage[request.code]
-        if code_data["expires_at"] > datetime.now() and not code_data["used"]:
-            # Simulate user based on email
-            if code_data["email"] == "staff@dounie-cuisine.ca":
-                user = {
-                    "id": "2",
-                    "firstName": "Staff",
-                    "lastName": "Member", 
-                    "email": "staff@dounie-cuisine.ca"
+async def verify_reset_code(request: PasswordResetVerify, http_request: Request):
+    """Verify reset code (public endpoint, rate limited per client)"""
+    await enforce_rate_limits((RESET_IP_LIMIT, client_ip(http_request)))
+    code_data = await auth_store.get_reset_code(request.code)
+    if code_data:
+        user = await auth_store.get_user_by_email(code_data["email"])
+        if user:
+            return {
+                "valid": True,
+                "user": {
+                    "id": user["id"],
+                    "firstName": user["firstName"],
+                    "lastName": user["lastName"],
+                    "email": user["email"]
                 }
-            else:
-                user = {
-                    "id": "1",
-                    "firstName": "Admin",
-                    "lastName": "Dounie",
-                    "email": code_data["email"]
-                }
-            return {"valid": True, "user": user}
-    
+            }
+
     return {"valid": False, "message": "Code invalide ou expiré"}
 
 @app.post("/api/auth/reset-password")
-async def reset_password(request: PasswordResetComplete):
-    """Reset password (public endpoint)"""
-    if request.code in reset_codes_storage:
-        code_data = reset_codes_storage[request.code]
-        if code_data["expires_at"] > datetime.now() and not code_data["used"]:
-            if len(request.newPassword) >= 8:
-                # Update user password
-                email = code_data["email"]
-                for username, creds in user_credentials.items():
-                    if creds["user_data"]["email"] == email:
-                        user_credentials[username]["password"] = request.newPassword
-                        logger.info(f"Password updated for user {username}")
-                        break
-                
-                # Mark code as used
-                reset_codes_storage[request.code]["used"] = True
-                return {"message": "Mot de passe réinitialisé avec succès"}
-            else:
-                raise HTTPException(status_code=400, detail="Le mot de passe doit contenir au moins 8 caractères")
-    
+async def reset_password(request: PasswordResetComplete, http_request: Request):
+    """Reset password (public endpoint, rate limited per client)"""
+    await enforce_rate_limits((RESET_IP_LIMIT, client_ip(http_request)))
+    if len(request.newPassword) < 8:
+        raise HTTPException(status_code=400, detail="Le mot de passe doit contenir au moins 8 caractères")
+
+    code_data = await auth_store.consume_reset_code(request.code)
+    if code_data:
+        user = await auth_store.get_user_by_email(code_data["email"])
+        if user:
+            await auth_store.set_password_hash(user["username"], await password_hasher.hash(request.newPassword))
+            logger.info(f"Password updated for user {user['username']}")
+            return {"message": "Mot de passe réinitialisé avec succès"}
+
     raise HTTPException(status_code=400, detail="Code invalide ou mot de passe trop faible")
 
 # Quote system endpoints
 @app.get("/api/quotes")
-async def get_quotes():
-    """Get all quotes"""
-    return []
-
-@app.post("/api/quotes")
-async def create_quote(quote_data: dict):
-    """Create new quote"""
-    quote_id = f"quote_{random.randint(1000, 9999)}"
-    return {"id": quote_id, **quote_data}
-
-@app.post("/api/quotes/{quote_id}/send")
-async def send_quote(quote_id: str):
-    """Send quote (manual notification system)"""
-    return {
-        "message": "Devis prêt à envoyer",
-        "note": "Envoi manuel requis - le système génère le devis mais l'envoi par email doit être fait manuellement par l'administrateur"
-    }
+async def get_quotes(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    clientId: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    staff: dict = Depends(require_staff),
+):
+    """Get quotes, newest first, without line items (staff only)"""
+    try:
+        docs, next_cursor = await quote_engine.list(status_filter, clientId, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse([public_quote(doc) for doc in docs], headers=headers)
+
+@app.get("/api/quotes/{quote_id}")
+async def get_quote(quote_id: str, staff: dict = Depends(require_staff)):
+    """Get one quote with its line items (staff only)"""
+    doc = await quote_engine.get(quote_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Devis introuvable")
+    return FastJSONResponse(public_quote(doc))
+
+@app.post("/api/quotes", status_code=status.HTTP_201_CREATED)
+async def create_quote(quote_data: QuoteCreate):
+    """Create new quote priced against the menu"""
+    try:
+        doc = await quote_engine.create(quote_data.model_dump(mode="json", exclude_none=True))
+    except UnknownMenuItemError as e:
+        raise HTTPException(status_code=400, detail=f"Article de menu inconnu : {e}")
+    await dashboard_stats.record_quote()
+    return FastJSONResponse(public_quote(doc), status_code=status.HTTP_201_CREATED)
+
+@app.post("/api/quotes/{quote_id}/send", status_code=status.HTTP_202_ACCEPTED)
+async def send_quote(
+    quote_id: str,
+    request: Optional[QuoteSendRequest] = None,
+    staff: dict = Depends(require_staff),
+):
+    """Queue the quote for delivery by the notification workers (staff only)"""
+    doc = await quote_engine.get(quote_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Devis introuvable")
+    to = (request.email if request else None) or doc.get("clientEmail")
+    if not to:
+        raise HTTPException(status_code=400, detail="Aucune adresse courriel pour ce devis")
+
+    job_id = await notification_queue.enqueue("quote", {"quoteId": quote_id, "to": to})
+    return {"message": "Envoi du devis programmé", "jobId": job_id}
+
+@app.get("/api/admin/notifications/metrics")
+async def get_notification_metrics(admin: dict = Depends(require_admin)):
+    """Queue depth and delivery latency (admin only)"""
+    return await notification_queue.metrics()
 
 # Menu endpoints
 @app.get("/api/menu")
-async def get_menu():
-    """Get menu items"""
-    return [
-        {
-            "id": "1",
-            "name": "Poule nan Sos",
-            "description": "Poulet traditionnel en sauce créole",
-            "price": 24.99,
-            "category": "plats"
-        },
-        {
-            "id": "2", 
-            "name": "Riz Collé aux Pois",
-            "description": "Riz aux haricots rouges, plat national",
-            "price": 18.99,
-            "category": "plats"
-        },
-        {
-            "id": "3",
-            "name": "Poisson Gros Sel", 
-            "description": "Poisson grillé aux épices créoles",
-            "price": 28.99,
-            "category": "plats"
-        }
-    ]
+async def get_menu(
+    category: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Get menu items (cached, supports ETag / If-None-Match)"""
+    page = await menu_catalog.get_page(category, offset, limit)
+    encoding = None
+    if accept_encoding and len(page.body) >= COMPRESSION_MIN_SIZE:
+        encoding = choose_encoding(accept_encoding)
+    headers = {
+        "ETag": f"W/{page.etag}" if encoding else page.etag,
+        "Cache-Control": "public, max-age=0, must-revalidate",
+        "Vary": "Accept-Encoding",
+        "X-Total-Count": str(page.total),
+    }
+    if etag_matches(if_none_match, page.etag):
+        return Response(status_code=304, headers=headers)
+    # Compressed once per cached page, per request for paginated ones; the middleware
+    # passes encoded bodies through
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=page.encoded(encoding), media_type="application/json", headers=headers)
 
 @app.post("/api/menu")
-async def create_menu_item(item_data: dict):
-    """Create menu item"""
-    return {"id": f"menu_{random.randint(1000, 9999)}", **item_data}
+async def create_menu_item(item_data: MenuItemCreate, staff: dict = Depends(require_staff)):
+    """Create menu item (staff only); quotes are priced from the menu"""
+    doc = await menu_catalog.create_item(item_data.model_dump(exclude_none=True))
+    await dashboard_stats.record_menu_item(item_data.isAvailable)
+    return {"id": doc["_id"], **item_data.model_dump(exclude_none=True)}
 
 # Reservations endpoints
 @app.get("/api/reservations")
-async def get_reservations():
-    """Get reservations"""
-    return []
-
-@app.post("/api/reservations")
-async def create_reservation(reservation_data: dict):
+async def get_reservations(
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    staff: dict = Depends(require_staff),
+):
+    """Get reservations in a date range, one page at a time (staff only)"""
+    try:
+        docs, next_cursor = await reservation_engine.list(date_from, date_to, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse([public_reservation(doc) for doc in docs], headers=headers)
+
+@app.post("/api/reservations", status_code=status.HTTP_201_CREATED)
+async def create_reservation(reservation_data: ReservationCreate):
     """Create reservation"""
-    return {"id": f"reservation_{random.randint(1000, 9999)}", **reservation_data}
+    try:
+        doc = await reservation_engine.create(reservation_data.model_dump())
+    except CapacityError as e:
+        logger.info(f"Reservation refused: {e}")
+        raise HTTPException(status_code=409, detail="Plus de places disponibles pour ce créneau")
+    await dashboard_stats.record_reservation(doc["status"])
+    return FastJSONResponse(public_reservation(doc), status_code=status.HTTP_201_CREATED)
 
 # Dashboard statistics endpoint
 @app.get("/api/dashboard/stats")
-async def get_dashboard_stats():
-    """Get dashboard statistics"""
-    return {
-        "totalOrders": 0,
-        "totalRevenue": 0,
-        "pendingReservations": 0,
-        "activeMenuItems": 3
-    }
+async def get_dashboard_stats(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    staff: dict = Depends(require_staff),
+):
+    """Get dashboard statistics from the daily rollups (staff only)"""
+    return FastJSONResponse(await dashboard_stats.summary(date_from, date_to))
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    from serve import main
+    main()
\ No newline at end of file
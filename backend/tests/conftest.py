@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database per test"""
+    return AsyncMongoMockClient()["dounie_cuisine_test"]
@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from auth_store import DEFAULT_USERS, MemoryAuthStore, MongoAuthStore, PasswordHasher, seed_default_users
+
+
+class FakeHasher:
+    """Stands in for bcrypt where the hash itself does not matter"""
+
+    async def hash(self, password: str) -> str:
+        return f"hashed:{password}"
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def store(request, db):
+    if request.param == "memory":
+        return MemoryAuthStore()
+    store = MongoAuthStore(db)
+    asyncio.run(store.ensure_indexes())
+    return store
+
+
+def test_seed_default_users_creates_accounts_once(store):
+    async def scenario():
+        await seed_default_users(store, FakeHasher())
+        await seed_default_users(store, FakeHasher())
+        assert await store.count_users() == len(DEFAULT_USERS)
+        admin = await store.get_user("admin")
+        assert admin["role"] == "admin"
+        assert admin["passwordHash"] == "hashed:Admin123!"
+        assert (await store.get_user_by_email("staff@dounie-cuisine.ca"))["username"] == "staff"
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_seeding_ignores_duplicates(db):
+    store = MongoAuthStore(db)
+
+    async def scenario():
+        await store.ensure_indexes()
+        await asyncio.gather(*(seed_default_users(store, FakeHasher()) for _ in range(3)))
+        assert await store.count_users() == len(DEFAULT_USERS)
+
+    asyncio.run(scenario())
+
+
+def test_seeded_password_verifies_with_bcrypt():
+    store = MemoryAuthStore()
+    hasher = PasswordHasher(max_workers=1)
+
+    async def scenario():
+        await seed_default_users(store, hasher)
+        admin = await store.get_user("admin")
+        assert await hasher.verify("Admin123!", admin["passwordHash"])
+        assert not await hasher.verify("wrong", admin["passwordHash"])
+        assert not await hasher.verify("Admin123!", None)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+
+def test_reset_code_is_consumed_once(store):
+    async def scenario():
+        await store.add_reset_code("ABCD1234", "staff@dounie-cuisine.ca", datetime.utcnow() + timedelta(hours=1))
+        assert (await store.get_reset_code("ABCD1234"))["email"] == "staff@dounie-cuisine.ca"
+        assert (await store.consume_reset_code("ABCD1234"))["used"] is True
+        assert await store.consume_reset_code("ABCD1234") is None
+        assert await store.get_reset_code("ABCD1234") is None
+        assert await store.list_active_codes() == []
+
+    asyncio.run(scenario())
+
+
+def test_expired_reset_code_is_rejected(store):
+    async def scenario():
+        now = datetime.utcnow()
+        await store.add_reset_code("EXPIRED1", "admin@dounie-cuisine.ca", now - timedelta(seconds=1))
+        await store.add_reset_code("LATER001", "admin@dounie-cuisine.ca", now + timedelta(hours=2))
+        await store.add_reset_code("SOONER01", "admin@dounie-cuisine.ca", now + timedelta(hours=1))
+        assert await store.get_reset_code("EXPIRED1") is None
+        assert await store.consume_reset_code("EXPIRED1") is None
+        assert [code["_id"] for code in await store.list_active_codes()] == ["SOONER01", "LATER001"]
+
+    asyncio.run(scenario())
+
+
+def test_unknown_reset_code(store):
+    async def scenario():
+        assert await store.get_reset_code("NOPE0000") is None
+        assert await store.consume_reset_code("NOPE0000") is None
+
+    asyncio.run(scenario())
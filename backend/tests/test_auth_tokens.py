@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from auth_tokens import ACCESS, REFRESH, InvalidTokenError, TokenDenylist, TokenService, profile_from_claims
+
+USER = {"id": "1", "username": "admin", "email": "admin@dounie-cuisine.ca",
+        "firstName": "Admin", "lastName": "Dounie", "role": "admin"}
+
+
+def test_denylist_forgets_expired_entries():
+    denylist = TokenDenylist()
+    now = time.time()
+    denylist.add("live", now + 60)
+    denylist.add("already-expired", now - 1)
+    assert "live" in denylist
+    assert "already-expired" not in denylist
+    assert len(denylist) == 1
+
+    denylist.add("short", now + 0.01)
+    time.sleep(0.02)
+    assert "short" not in denylist
+    denylist.add("other", now + 60)  # adding prunes what has expired
+    assert len(denylist) == 2
+
+
+def test_issue_and_verify_pair():
+    service = TokenService("test-secret")
+    tokens = service.issue_pair(USER)
+    assert profile_from_claims(service.verify(tokens["accessToken"])) == USER
+    assert service.verify(tokens["refreshToken"], REFRESH)["sub"] == "1"
+    with pytest.raises(InvalidTokenError):
+        service.verify(tokens["refreshToken"], ACCESS)
+    with pytest.raises(InvalidTokenError):
+        service.verify(tokens["accessToken"], REFRESH)
+
+
+def test_rejects_tampered_or_foreign_tokens():
+    service = TokenService("test-secret")
+    token = service.issue_pair(USER)["accessToken"]
+    with pytest.raises(InvalidTokenError):
+        service.verify(token[:-2] + ("AA" if token[-2:] != "AA" else "BB"))
+    with pytest.raises(InvalidTokenError):
+        TokenService("other-secret").verify(token)
+
+
+def test_revocation_reaches_other_workers(db):
+    collection = db["revoked_tokens"]
+    worker_a = TokenService("test-secret")
+    worker_b = TokenService("test-secret")
+    token = worker_a.issue_pair(USER)["accessToken"]
+
+    async def scenario():
+        await worker_a.ensure_indexes(collection)
+        assert worker_b.verify(token)["sub"] == "1"
+        await worker_a.revoke(worker_a.verify(token), collection)
+        with pytest.raises(InvalidTokenError):
+            worker_a.verify(token)
+        await worker_b.pull_revocations(collection)
+        with pytest.raises(InvalidTokenError):
+            worker_b.verify(token)
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+import gzip
+import json
+
+import brotli
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+
+from compression import CompressionMiddleware, choose_encoding
+
+BIG = {"items": ["Poule nan Sos"] * 200}
+
+
+def test_choose_encoding_honours_q_values():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+    assert choose_encoding("GZIP;q=0.5") == "gzip"
+    assert choose_encoding("gzip;q=0, br;q=0") is None
+    assert choose_encoding("gzip;q=abc") is None
+    assert choose_encoding("identity") is None
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    async def big():
+        return JSONResponse(BIG, headers={"ETag": '"abc"', "Vary": "Origin"})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/encoded")
+    async def encoded():
+        body = gzip.compress(b"[" + b'"x",' * 1000 + b'"x"]')
+        return Response(body, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+def fetch(path: str, accept_encoding: str):
+    """Headers and the body as sent, before httpx decodes it"""
+    async def scenario():
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            request = client.build_request("GET", path, headers={"Accept-Encoding": accept_encoding})
+            response = await client.send(request, stream=True)
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            return response.headers, raw
+
+    return asyncio.run(scenario())
+
+
+def test_large_responses_are_compressed_with_a_weak_etag():
+    headers, raw = fetch("/big", "br")
+    assert headers["content-encoding"] == "br"
+    assert headers["etag"] == 'W/"abc"'
+    assert headers["vary"] == "Origin, Accept-Encoding"
+    assert int(headers["content-length"]) == len(raw)
+    assert json.loads(brotli.decompress(raw)) == BIG
+
+
+def test_small_and_unaccepted_responses_are_untouched():
+    headers, raw = fetch("/small", "gzip")
+    assert "content-encoding" not in headers and raw == b'{"ok":true}'
+    headers, raw = fetch("/big", "gzip;q=0")
+    assert "content-encoding" not in headers
+    assert headers["etag"] == '"abc"'
+
+
+def test_already_encoded_bodies_pass_through():
+    headers, raw = fetch("/encoded", "br, gzip")
+    assert headers["content-encoding"] == "gzip"
+    # Compressed once, by the handler
+    assert gzip.decompress(raw).startswith(b'["x"')
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from dashboard_stats import DashboardStats, RebuildInProgress
+from menu_catalog import DEFAULT_MENU_ITEMS, MenuCatalog
+
+
+def test_summary_reads_flows_in_range_and_current_gauges(db):
+    stats = DashboardStats(db)
+
+    async def scenario():
+        await stats.record_order("10.25", datetime(2031, 1, 1, 12))
+        await stats.record_order(5, datetime(2031, 1, 2, 12))
+        await stats.record_quote(datetime(2031, 1, 3, 12))
+        await stats.record_reservation("pending")
+        await stats.record_reservation("confirmed")
+        await stats.record_menu_item(True)
+        await stats.record_menu_item(False)
+
+        summary = await stats.summary(date(2031, 1, 2), date(2031, 1, 2))
+        assert summary == {"totalOrders": 1, "totalRevenue": 5.0, "totalQuotes": 0,
+                           "pendingReservations": 1, "activeMenuItems": 1}
+        summary = await stats.summary()
+        assert (summary["totalOrders"], summary["totalRevenue"], summary["totalQuotes"]) == (2, 15.25, 1)
+
+    asyncio.run(scenario())
+
+
+def test_rebuild_repairs_drift_and_keeps_later_increments(db):
+    stats = DashboardStats(db)
+    now = datetime.utcnow()
+    past = now - timedelta(days=3)
+
+    async def scenario():
+        await db["orders"].insert_many([
+            {"status": "done", "totalAmount": 10.5, "createdAt": past},
+            {"status": "cancelled", "totalAmount": 99, "createdAt": past},
+            {"status": "done", "totalAmount": 1.25, "createdAt": now},
+        ])
+        await db["reservations"].insert_one({"status": "pending", "createdAt": now})
+        # Drifted counters, including a day that has no raw data at all
+        await stats.record_order(1000, past)
+        await stats.record_order(1, datetime(2001, 1, 1))
+        await stats.record_reservation("pending")
+        await stats.record_reservation("pending")
+
+        await stats.rebuild()
+        await stats.record_reservation("pending")  # a write after the rebuild
+
+        summary = await stats.summary()
+        assert (summary["totalOrders"], summary["totalRevenue"]) == (2, 11.75)
+        assert summary["pendingReservations"] == 2
+        assert await db["daily_stats"].find_one({"_id": "2001-01-01"}) is None
+        assert [name for name in await db.list_collection_names() if name.startswith("daily_stats_rebuild")] == []
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_rebuilds_run_once(db):
+    stats = DashboardStats(db)
+
+    async def scenario():
+        await db["menu_items"].insert_one({"isAvailable": True, "createdAt": datetime.utcnow()})
+        await stats._acquire_rebuild_lock("other-worker", 60)
+        with pytest.raises(RebuildInProgress):
+            await stats.rebuild()
+        await db["dashboard_meta"].delete_one({"_id": "rebuild_lock"})
+
+        results = await asyncio.gather(*(stats.rebuild() for _ in range(3)), return_exceptions=True)
+        assert any(not isinstance(result, Exception) for result in results)
+        assert all(isinstance(result, RebuildInProgress) for result in results if isinstance(result, Exception))
+        assert (await stats.summary())["activeMenuItems"] == 1
+        # The lock is released afterwards
+        await stats.rebuild()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_menu_seeding(db):
+    catalogs = [MenuCatalog(db) for _ in range(3)]
+
+    async def scenario():
+        await asyncio.gather(*(catalog.seed() for catalog in catalogs))
+        assert await db["menu_items"].count_documents({}) == len(DEFAULT_MENU_ITEMS)
+        assert (await catalogs[0].get_page()).total == len(DEFAULT_MENU_ITEMS)
+
+    asyncio.run(scenario())
+
+
+def test_rebuild_counts_documents_from_the_cutoff_millisecond(db, monkeypatch):
+    cutoff = datetime(2031, 1, 1, 12, 0, 0, 123900)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return cutoff
+
+    monkeypatch.setattr("dashboard_stats.datetime", FrozenDatetime)
+    stats = DashboardStats(db)
+
+    async def scenario():
+        # Stored as 12:00:00.123, the same millisecond as the cutoff
+        await db["menu_items"].insert_one({"name": "Plat", "createdAt": cutoff.replace(microsecond=123400)})
+        await stats.rebuild()
+        assert (await stats.summary())["activeMenuItems"] == 1
+
+    asyncio.run(scenario())
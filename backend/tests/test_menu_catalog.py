@@ -0,0 +1,54 @@
+import asyncio
+import gzip
+import json
+
+from menu_catalog import CatalogPage, MenuCatalog, etag_matches
+
+
+def test_compressed_bodies_are_cached_per_encoding():
+    page = CatalogPage(json.dumps([{"name": "Plat"}] * 100).encode(), 100)
+    compressed = page.encoded("gzip")
+    assert page.encoded("gzip") is compressed
+    assert gzip.decompress(compressed) == page.body
+    assert page.encoded(None) is page.body
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_writes_change_the_page_and_its_etag(db):
+    catalog = MenuCatalog(db)
+
+    async def scenario():
+        await catalog.seed()
+        first = await catalog.get_page()
+        assert first.total == 3
+        assert await catalog.get_page() is first
+        await catalog.create_item({"name": "Diri ak Djon Djon", "price": 19.5, "category": "plats"})
+        second = await catalog.get_page()
+        assert second.total == 4 and second.etag != first.etag
+        assert [item["name"] for item in json.loads(second.body)][-1] == "Diri ak Djon Djon"
+        assert (await catalog.get_page("desserts")).body == b"[]"
+
+    asyncio.run(scenario())
+
+
+def test_only_unpaginated_pages_are_cached(db):
+    catalog = MenuCatalog(db)
+
+    async def scenario():
+        await catalog.seed()
+        assert await catalog.get_page("plats") is await catalog.get_page("plats")
+        page = await catalog.get_page(offset=1, limit=1)
+        assert page is not await catalog.get_page(offset=1, limit=1)
+        assert len(json.loads(page.body)) == 1 and page.total == 3
+        await catalog.get_page("inconnue")
+        assert set(catalog._pages) == {"plats"}
+
+    asyncio.run(scenario())
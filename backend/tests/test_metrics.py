@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from metrics import Histogram, MetricsMiddleware, MetricsRegistry, MongoCommandMetrics, ReadinessProbe
+
+
+def test_histogram_buckets_are_inclusive_upper_bounds():
+    histogram = Histogram((0.1, 0.5))
+    for value in (0.05, 0.1, 0.3, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 2, 1]
+    lines = histogram.render("latency", 'route="/x"')
+    assert lines[:3] == [
+        'latency_bucket{route="/x",le="0.1"} 2',
+        'latency_bucket{route="/x",le="0.5"} 4',
+        'latency_bucket{route="/x",le="+Inf"} 5',
+    ]
+    assert lines[-1] == 'latency_count{route="/x"} 5'
+
+
+def test_middleware_labels_requests_by_route_template_and_status_class():
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/items/1")
+            await client.get("/items/2")
+            await client.get("/items/missing")
+            await client.get("/random/path")
+
+    asyncio.run(scenario())
+    assert registry.requests == {
+        ("GET", "/items/{item_id}", "2xx"): 2,
+        ("GET", "/items/{item_id}", "4xx"): 1,
+        ("GET", "unmatched", "4xx"): 1,
+    }
+    assert registry.latency[("GET", "/items/{item_id}")].count == 3
+    assert 'dounie_http_requests_total{method="GET",route="unmatched",status="4xx"} 1' in registry.render()
+
+
+def test_mongo_listener_records_latency_and_failures():
+    registry = MetricsRegistry()
+    listener = MongoCommandMetrics(registry)
+    listener.succeeded(SimpleNamespace(command_name="find", duration_micros=2000))
+    listener.failed(SimpleNamespace(command_name="find", duration_micros=500))
+    assert registry.mongo_latency["find"].count == 2
+    assert registry.mongo_latency["find"].total == 0.0025
+    assert registry.mongo_failures == {"find": 1}
+    assert 'dounie_mongo_command_failures_total{command="find"} 1' in registry.render()
+
+
+class FakeClient:
+    """Answers ping, or fails it, and counts the calls"""
+
+    def __init__(self, fail: bool = False):
+        self.pings = 0
+        self.fail = fail
+        self.admin = self
+
+    async def command(self, name):
+        self.pings += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("refused")
+        return {"ok": 1}
+
+
+def test_readiness_probe_caches_the_answer():
+    probe = ReadinessProbe(cache_seconds=60)
+    client = FakeClient()
+
+    async def scenario():
+        results = await asyncio.gather(*(probe.check(client) for _ in range(5)))
+        assert results == [(True, None)] * 5
+        await probe.check(client)
+
+    asyncio.run(scenario())
+    assert client.pings == 1
+
+
+def test_readiness_probe_reports_failures():
+    async def scenario():
+        assert await ReadinessProbe().check(FakeClient(fail=True)) == (False, "ConnectionError: refused")
+        assert await ReadinessProbe().check(None) == (False, "RuntimeError: no MongoDB client")
+        ready, error = await ReadinessProbe(timeout=0.001).check(FakeClient())
+        assert not ready and error.startswith("TimeoutError")
+
+        probe = ReadinessProbe(cache_seconds=0)
+        client = FakeClient(fail=True)
+        assert not (await probe.check(client))[0]
+        client.fail = False
+        assert await probe.check(client) == (True, None)
+
+    asyncio.run(scenario())
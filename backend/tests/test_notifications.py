@@ -0,0 +1,73 @@
+import asyncio
+
+from notifications import QUEUED, SENT, NotificationQueue, NotificationWorkerPool
+
+
+def test_failed_jobs_are_retried_then_dead_lettered(db):
+    queue = NotificationQueue(db, max_attempts=2, backoff_seconds=0)
+
+    async def failing(payload):
+        raise ConnectionError("smtp down")
+
+    async def scenario():
+        job_id = await queue.enqueue("quote", {"quoteId": "q1"})
+        pool = NotificationWorkerPool(queue, {"quote": failing}, concurrency=1, poll_seconds=0.01)
+        pool.start()
+        for _ in range(200):
+            if await queue.dead_letters.count_documents({}):
+                break
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        dead = await queue.dead_letters.find_one({"_id": job_id})
+        assert dead["attempts"] == 2
+        assert dead["lastError"] == "ConnectionError: smtp down"
+        assert await queue.jobs.count_documents({}) == 0
+
+    asyncio.run(scenario())
+
+
+def test_worker_survives_queue_errors(db, monkeypatch):
+    queue = NotificationQueue(db, max_attempts=1)
+    delivered = []
+
+    async def handler(payload):
+        if payload["n"] == 1:
+            raise RuntimeError("boom")
+        delivered.append(payload["n"])
+
+    async def broken_replace_one(*args, **kwargs):
+        raise RuntimeError("dead letter write failed")
+
+    monkeypatch.setattr(queue.dead_letters, "replace_one", broken_replace_one)
+
+    async def scenario():
+        await queue.enqueue("quote", {"n": 1})
+        pool = NotificationWorkerPool(queue, {"quote": handler}, concurrency=1, poll_seconds=0.01)
+        pool.start()
+        await asyncio.sleep(0.05)
+        second = await queue.enqueue("quote", {"n": 2})
+        for _ in range(200):
+            if delivered:
+                break
+            await asyncio.sleep(0.01)
+        alive = not pool.tasks[0].done()
+        await pool.stop()
+        assert alive
+        assert delivered == [2]
+        assert (await queue.jobs.find_one({"_id": second}))["status"] == SENT
+
+    asyncio.run(scenario())
+
+
+def test_claim_takes_each_job_once(db):
+    queue = NotificationQueue(db)
+
+    async def scenario():
+        for i in range(5):
+            await queue.enqueue("quote", {"n": i})
+        claimed = await asyncio.gather(*(queue.claim(f"w{i}") for i in range(8)))
+        jobs = [job for job in claimed if job]
+        assert len({job["_id"] for job in jobs}) == 5
+        assert await queue.jobs.count_documents({"status": QUEUED}) == 0
+
+    asyncio.run(scenario())
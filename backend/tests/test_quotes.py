@@ -0,0 +1,60 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from menu_catalog import MenuCatalog
+from quotes import QuoteEngine, UnknownMenuItemError, calculate_canadian_taxes, public_quote
+
+
+# Expected values come from calculateCanadianTaxes in api/services/accounting.ts
+@pytest.mark.parametrize("subtotal, gst, qst, total", [
+    ("1.10", "0.06", "0.11", "1.26"),    # half-cent GST; total is not 1.10 + 0.06 + 0.11
+    ("0.10", "0.01", "0.01", "0.11"),    # half-cent GST
+    ("5.50", "0.28", "0.55", "6.32"),    # half-cent GST
+    ("10.00", "0.50", "1.00", "11.50"),
+    ("100.00", "5.00", "9.98", "114.98"),  # half-cent QST
+    ("344.85", "17.24", "34.40", "396.49"),
+    ("0.00", "0.00", "0.00", "0.00"),
+])
+def test_taxes_match_the_node_calculation(subtotal, gst, qst, total):
+    taxes = calculate_canadian_taxes(Decimal(subtotal))
+    assert taxes == {
+        "subtotal": Decimal(subtotal),
+        "gstAmount": Decimal(gst),
+        "qstAmount": Decimal(qst),
+        "total": Decimal(total),
+    }
+
+
+@pytest.mark.parametrize("discount, subtotal, gst, qst, tax, total", [
+    ("0", "316.87", "15.84", "31.61", "47.45", "364.32"),
+    ("10.50", "316.87", "15.32", "30.56", "45.88", "352.25"),
+    ("1000", "316.87", "0.00", "0.00", "0.00", "0.00"),  # discount capped at the subtotal
+])
+def test_quote_amounts(db, discount, subtotal, gst, qst, tax, total):
+    async def scenario():
+        await MenuCatalog(db).seed()
+        engine = QuoteEngine(db)
+        doc = await engine.create({
+            "clientName": "Test",
+            "discountAmount": Decimal(discount),
+            # 24.99 * 10 + 18.99 * 2 + 28.99 * 1 - prices come from the menu, not the client
+            "items": [{"menuItemId": "1", "quantity": 10}, {"menuItemId": "2", "quantity": 2},
+                      {"menuItemId": "3", "quantity": 1, "description": "Poisson"}],
+        })
+        quote = public_quote(doc)
+        assert (quote["subtotalHT"], quote["gstAmount"], quote["qstAmount"]) == (subtotal, gst, qst)
+        assert (quote["taxAmount"], quote["totalTTC"]) == (tax, total)
+        assert [item["total"] for item in quote["items"]] == ["249.90", "37.98", "28.99"]
+        assert quote["items"][2]["description"] == "Poisson"
+
+    asyncio.run(scenario())
+
+
+def test_unknown_menu_item(db):
+    async def scenario():
+        with pytest.raises(UnknownMenuItemError):
+            await QuoteEngine(db).create({"items": [{"menuItemId": "missing", "quantity": 1}]})
+
+    asyncio.run(scenario())
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limit
+from rate_limit import MemoryRateLimiter, MongoRateLimiter, RateLimit, retry_after_header
+
+RULE = RateLimit("login_ip", 3, 60)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=6000.0)  # start of window 100
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def limiter(request, db):
+    return MemoryRateLimiter() if request.param == "memory" else MongoRateLimiter(db)
+
+
+def test_parse():
+    rule = RateLimit.parse("reset_ip", "10/900")
+    assert (rule.name, rule.limit, rule.window) == ("reset_ip", 10, 900.0)
+
+
+def test_retry_after_header_rounds_up():
+    assert retry_after_header(0.2) == "1"
+    assert retry_after_header(12.01) == "13"
+
+
+def test_limit_within_a_window(limiter, clock):
+    async def scenario():
+        assert [await limiter.hit(RULE, "1.2.3.4") for _ in range(3)] == [0, 0, 0]
+        clock.value += 15
+        assert await limiter.hit(RULE, "1.2.3.4") == pytest.approx(45)
+        # Other keys have their own budget
+        assert await limiter.hit(RULE, "5.6.7.8") == 0
+
+    asyncio.run(scenario())
+
+
+def test_previous_window_fades_out(limiter, clock):
+    async def scenario():
+        for _ in range(3):
+            await limiter.hit(RULE, "key")
+        clock.value += 90  # half way through the next window: 3 * 0.5 = 1.5 still counted
+        assert await limiter.hit(RULE, "key") == 0
+        assert await limiter.hit(RULE, "key") == 0
+        # 1.5 + 2 >= 3 until the previous window weighs less than 1
+        assert await limiter.hit(RULE, "key") == pytest.approx(10)
+        clock.value += 10.5
+        assert await limiter.hit(RULE, "key") == 0
+
+    asyncio.run(scenario())
+
+
+def test_denied_hits_are_not_counted(limiter, clock):
+    async def scenario():
+        for _ in range(3):
+            await limiter.hit(RULE, "key")
+        for _ in range(10):
+            assert await limiter.hit(RULE, "key") > 0
+        clock.value += 120  # two windows later nothing is left
+        assert await limiter.hit(RULE, "key") == 0
+
+    asyncio.run(scenario())
+
+
+def test_memory_limiter_prunes_stale_keys(clock):
+    limiter = MemoryRateLimiter(max_keys=2)
+
+    async def scenario():
+        await limiter.hit(RULE, "a")
+        await limiter.hit(RULE, "b")
+        clock.value += 180
+        await limiter.hit(RULE, "c")
+        assert set(limiter.counters) == {"login_ip:c"}
+
+    asyncio.run(scenario())
+
+
+def test_check_does_not_spend_the_budget(limiter, clock):
+    async def scenario():
+        for _ in range(5):
+            assert await limiter.check(RULE, "admin") == 0
+        for _ in range(3):
+            await limiter.hit(RULE, "admin")
+        assert await limiter.check(RULE, "admin") == pytest.approx(60)
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor
+from reservations import CapacityError, ReservationEngine, public_reservation, slot_keys
+
+START = datetime(2031, 1, 2, 18, 0)
+
+
+def booking(party_size: int, moment: datetime = START, duration: int = 60) -> dict:
+    return {"guestName": "Test", "guestEmail": "test@example.com", "guestPhone": "514-555-0123",
+            "partySize": party_size, "dateTime": moment, "durationMinutes": duration}
+
+
+def test_slot_keys_cover_the_whole_reservation():
+    keys = [key for key, _ in slot_keys(datetime(2031, 1, 2, 18, 40), 60)]
+    assert keys == ["2031-01-02T18:30", "2031-01-02T19:00", "2031-01-02T19:30"]
+
+
+def test_capacity_is_never_exceeded(db):
+    engine = ReservationEngine(db, seats_per_slot=10)
+
+    async def scenario():
+        await engine.ensure_indexes()
+        results = await asyncio.gather(
+            *(engine.create(booking(3)) for _ in range(5)), return_exceptions=True
+        )
+        assert sum(not isinstance(result, Exception) for result in results) == 3
+        assert all(isinstance(result, CapacityError) for result in results if isinstance(result, Exception))
+        with pytest.raises(CapacityError):
+            await engine.create(booking(11, START + timedelta(days=1)))
+
+    asyncio.run(scenario())
+
+
+def test_refused_booking_releases_the_slots_it_took(db):
+    engine = ReservationEngine(db, seats_per_slot=10)
+
+    async def scenario():
+        await engine.create(booking(10, START + timedelta(minutes=60), duration=30))
+        # Covers 18:00, 18:30 (free) and 19:00 (full)
+        with pytest.raises(CapacityError):
+            await engine.create(booking(4, duration=90))
+        slots = {doc["_id"]: doc["seats"] async for doc in db["reservation_slots"].find({})}
+        assert slots["2031-01-02T18:00"] == 0
+        assert slots["2031-01-02T18:30"] == 0
+        assert slots["2031-01-02T19:00"] == 10
+
+    asyncio.run(scenario())
+
+
+def test_timezone_aware_input_is_stored_as_utc(db):
+    engine = ReservationEngine(db)
+    moment = datetime(2031, 1, 1, 19, 15, tzinfo=timezone(timedelta(hours=-5)))
+
+    async def scenario():
+        doc = await engine.create(booking(2, moment))
+        assert public_reservation(doc)["dateTime"] == "2031-01-02T00:15:00+00:00"
+
+    asyncio.run(scenario())
+
+
+def test_list_pages_through_every_reservation_once(db):
+    engine = ReservationEngine(db)
+
+    async def scenario():
+        created = set()
+        for i in range(7):
+            # Two reservations share each time so the _id tie-breaker matters
+            created.add((await engine.create(booking(1, START + timedelta(hours=i // 2))))["_id"])
+        seen, cursor = [], None
+        while True:
+            page, cursor = await engine.list(cursor=cursor, limit=3)
+            seen += page
+            if cursor is None:
+                break
+        assert [doc["_id"] for doc in seen] == [doc["_id"] for doc in sorted(seen, key=lambda d: (d["dateTime"], d["_id"]))]
+        assert {doc["_id"] for doc in seen} == created and len(seen) == 7
+
+        in_range, _ = await engine.list(START + timedelta(hours=1), START + timedelta(hours=2))
+        assert len(in_range) == 2
+
+    asyncio.run(scenario())
+
+
+def test_cursor_round_trip_and_garbage():
+    moment = datetime(2031, 1, 2, 18, 0, 5, 123000)
+    assert decode_cursor(encode_cursor(moment, "abc")) == (moment, "abc")
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+def test_times_without_offset_are_restaurant_local(db):
+    engine = ReservationEngine(db, local_zone=ZoneInfo("America/Montreal"))
+
+    async def scenario():
+        # 19:00 in Montréal (UTC-4 in July) is 23:00 UTC
+        doc = await engine.create(booking(2, datetime(2031, 7, 1, 19, 0)))
+        assert public_reservation(doc)["dateTime"] == "2031-07-01T23:00:00+00:00"
+        aware = datetime(2031, 7, 1, 19, 0, tzinfo=timezone(timedelta(hours=-4)))
+        assert (await engine.create(booking(2, aware)))["dateTime"] == doc["dateTime"]
+        assert await db["reservation_slots"].count_documents({"_id": "2031-07-01T23:00"}) == 1
+
+        # A local day is queried with naive bounds: 19:00 is on July 1st, not 2nd
+        docs, _ = await engine.list(datetime(2031, 7, 1), datetime(2031, 7, 2))
+        assert len(docs) == 2
+        docs, _ = await engine.list(datetime(2031, 7, 2), datetime(2031, 7, 3))
+        assert docs == []
+
+    asyncio.run(scenario())
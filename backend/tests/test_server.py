@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from auth_store import PasswordHasher
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Run a scenario against the app started on an in-memory database"""
+    monkeypatch.setenv("SECRET_KEY", "test-secret-key")
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "memory")
+    import server
+
+    monkeypatch.setattr(server, "AsyncIOMotorClient", lambda *args, **kwargs: AsyncMongoMockClient())
+    # shutdown_event stops the hasher's pool, so each test gets its own
+    monkeypatch.setattr(server, "password_hasher", PasswordHasher(1))
+
+    def run(scenario):
+        async def main():
+            await server.startup_event()
+            try:
+                transport = httpx.ASGITransport(app=server.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    return await scenario(client)
+            finally:
+                await server.shutdown_event()
+
+        return asyncio.run(main())
+
+    return run
+
+
+async def staff_headers(client) -> dict:
+    response = await client.post("/api/auth/login", json={"username": "staff", "password": "Staff123!"})
+    return {"Authorization": f"Bearer {response.json()['accessToken']}"}
+
+
+ITEM = {"name": "Griot", "description": "Porc frit", "price": 18.5, "category": "plats"}
+
+
+def test_anonymous_menu_write_is_rejected(api):
+    async def scenario(client):
+        response = await client.post("/api/menu", json={**ITEM, "price": 0.01})
+        assert response.status_code == 401
+        menu = await client.get("/api/menu")
+        assert "Griot" not in [item["name"] for item in menu.json()]
+
+    api(scenario)
+
+
+def test_staff_menu_write_is_served(api):
+    async def scenario(client):
+        headers = await staff_headers(client)
+        response = await client.post("/api/menu", json=ITEM, headers=headers)
+        assert response.status_code == 200
+        menu = await client.get("/api/menu")
+        assert "Griot" in [item["name"] for item in menu.json()]
+
+    api(scenario)
+
+
+def test_negative_menu_price_is_rejected(api):
+    async def scenario(client):
+        headers = await staff_headers(client)
+        response = await client.post("/api/menu", json={**ITEM, "price": -5}, headers=headers)
+        assert response.status_code == 422
+
+    api(scenario)
+
+
+def test_dashboard_stats_require_staff(api):
+    async def scenario(client):
+        assert (await client.get("/api/dashboard/stats")).status_code == 401
+        response = await client.get("/api/dashboard/stats", headers=await staff_headers(client))
+        assert response.status_code == 200
+        assert response.json()["activeMenuItems"] == 3
+
+    api(scenario)
+
+
+def test_health_is_503_without_mongodb(api, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "readiness_probe", server.ReadinessProbe())
+
+    async def scenario(client):
+        assert (await client.get("/api/health")).status_code == 200
+        monkeypatch.setattr(server, "readiness_probe", server.ReadinessProbe())
+        monkeypatch.setattr(server, "mongodb_client", None)
+        response = await client.get("/api/health")
+        assert response.status_code == 503
+        assert response.json()["status"] == "degraded"
+
+    api(scenario)